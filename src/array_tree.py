@@ -0,0 +1,169 @@
+import numpy as np
+
+STATE_NODE = 0
+ACTION_NODE = 1
+
+
+class ArrayTree:
+    """
+    an MCTS tree stored in growable numpy arrays rather than MCTSNode objects, with every node identified by its index.
+    a state node's action nodes are all added at once, so they are stored next to each other and found from the
+    index of the first one and how many there are. the state nodes under an action node are found by the game's state
+    hash, since only the outcomes that have been seen are stored
+    """
+
+    def __init__(self, players_num=4, capacity=1024):
+        """
+        :param players_num: the number of players, i.e. the length of the value vectors
+        :param capacity: the number of nodes to make room for at first. the arrays double in size when they fill up
+        """
+        self.players_num = players_num
+        self.size = 0
+        self.node_type = np.zeros(capacity, np.int8)
+        self.turn = np.zeros(capacity, np.int8)
+        # the visit count and the sum of the normalized rewards of each player, for each node
+        self.N = np.zeros(capacity, np.int64)
+        self.w = np.zeros((capacity, players_num))
+        self.parent = np.full(capacity, -1, np.int32)
+        # the action nodes of each state node are first_child, first_child + 1, ..., first_child + children_num - 1
+        self.first_child = np.zeros(capacity, np.int32)
+        self.children_num = np.zeros(capacity, np.int32)
+        # the id of the action each action node is for, see get_action
+        self.action = np.full(capacity, -1, np.int32)
+        # the state node reached by each action node, keyed by the action node's index and the state's hash
+        self.state_sons = {}
+        # for the action nodes that are chance nodes, how many times each outcome has been chosen, and the state node
+        # each outcome led to, keyed by the outcome's index
+        self.chance_counts = {}
+        self.chance_sons = {}
+        self.action_ids = {}
+        self.actions = []
+        self.root = -1
+        # the action node chosen by the last search, which the next search starts under
+        self.chosen = -1
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        """the memory used by the node arrays"""
+        return sum(
+            a.nbytes
+            for a in (self.node_type, self.turn, self.N, self.w, self.parent, self.first_child, self.children_num,
+                      self.action)
+        )
+
+    def clear(self):
+        """remove every node, keeping the arrays so that they don't need to be allocated again"""
+        self.size = 0
+        self.state_sons.clear()
+        self.chance_counts.clear()
+        self.chance_sons.clear()
+        self.root = -1
+        self.chosen = -1
+
+    def add_state_node(self, parent, turn, actions, state_hash=None):
+        """
+        add a state node along with an action node for each of its actions
+        :param parent: the action node that leads to the state, or -1 for the root
+        :param turn: the id of the player whose turn it is
+        :param actions: the actions that can be made from the state
+        :param state_hash: the game's state hash, needed unless the node is the root
+        :return: the index of the state node
+        """
+        index = self.size
+        self._grow(index + 1 + len(actions))
+        self.node_type[index] = STATE_NODE
+        self.turn[index] = turn
+        self.parent[index] = parent
+        self.first_child[index] = index + 1
+        self.children_num[index] = len(actions)
+        children = slice(index + 1, index + 1 + len(actions))
+        self.node_type[children] = ACTION_NODE
+        self.turn[children] = turn
+        self.parent[children] = index
+        self.children_num[children] = 0
+        self.action[children] = [self.get_action_id(a) for a in actions]
+        self.N[index:children.stop] = 0
+        self.w[index:children.stop] = 0
+        self.size = children.stop
+        if parent >= 0:
+            self.state_sons[(parent, state_hash)] = index
+        return index
+
+    def get_children(self, node):
+        """:return: the range of indices of a state node's action nodes"""
+        first = int(self.first_child[node])
+        return range(first, first + int(self.children_num[node]))
+
+    def get_action_id(self, action):
+        """:return: the integer id of an action, giving it one if it doesn't have one yet"""
+        action_id = self.action_ids.get(action)
+        if action_id is None:
+            action_id = len(self.actions)
+            self.action_ids[action] = action_id
+            self.actions.append(action)
+        return action_id
+
+    def get_action(self, node):
+        """:return: the action of an action node"""
+        return self.actions[self.action[node]]
+
+    def reroot(self, root):
+        """
+        make a state node the root, and discard every node that isn't under it. the nodes that are kept are moved to
+        the start of the arrays, so the tree doesn't keep growing when it is reused move after move
+        :param root: the index of the new root
+        """
+        sons = {}
+        for (action_node, state_hash), state_node in self.state_sons.items():
+            sons.setdefault(action_node, []).append(state_node)
+        # the nodes to keep in breadth first order, which keeps each state node's action nodes next to each other
+        order = [root]
+        for node in order:
+            if self.node_type[node] == STATE_NODE:
+                order.extend(self.get_children(node))
+            else:
+                order.extend(sons.get(node, ()))
+        order = np.array(order)
+        new_index = np.full(self.size, -1, np.int32)
+        new_index[order] = np.arange(len(order), dtype=np.int32)
+
+        for a in (self.node_type, self.turn, self.N, self.w, self.first_child, self.children_num, self.action):
+            a[:len(order)] = a[order]
+        parent = self.parent[order]
+        self.parent[:len(order)] = np.where(parent >= 0, new_index[parent], -1)
+        self.parent[0] = -1
+        has_children = self.children_num[:len(order)] > 0
+        self.first_child[:len(order)][has_children] = new_index[self.first_child[:len(order)][has_children]]
+        self.state_sons = {
+            (int(new_index[action_node]), state_hash): int(new_index[state_node])
+            for (action_node, state_hash), state_node in self.state_sons.items()
+            if new_index[action_node] >= 0
+        }
+        self.chance_counts = {
+            int(new_index[action_node]): counts
+            for action_node, counts in self.chance_counts.items()
+            if new_index[action_node] >= 0
+        }
+        self.chance_sons = {
+            int(new_index[action_node]): {outcome: int(new_index[state_node]) for outcome, state_node in sons.items()}
+            for action_node, sons in self.chance_sons.items()
+            if new_index[action_node] >= 0
+        }
+        self.size = len(order)
+        self.root = 0
+        self.chosen = -1
+
+    def _grow(self, size):
+        capacity = len(self.N)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ("node_type", "turn", "N", "w", "parent", "first_child", "children_num", "action"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
@@ -7,16 +7,18 @@ import string
 import random
 from torch import Tensor
 import sys
-from copy import deepcopy
 
 
 class Catan(object):
+    # each roll of two dice and its probability, the chance outcomes of ending a turn
+    DICE_OUTCOMES = [(dice, (6 - abs(7 - dice)) / 36) for dice in range(2, 13)]
+
     def __init__(self):
 
         self.picked_settl_coo = None
-        self.init_state = 2
         # self.num_players = num_players
         self.game = Game(BeginnerBoard())
+        self.init_state = 2
         self.renderer = BoardRenderer(self.game.board)
         self.label_letters = string.ascii_lowercase + string.ascii_uppercase + "123456789"
 
@@ -29,10 +31,43 @@ class Catan(object):
         # Roll the dice
         self.dice = self.roll_dice()
 
+    @property
+    def cur_id_player(self):
+        """the id of the player whose turn it is, kept on the game so that it is part of the state hash"""
+        return self.game.turn
+
+    @cur_id_player.setter
+    def cur_id_player(self, cur_id_player):
+        self.game.turn = cur_id_player
+
+    @property
+    def init_state(self):
+        """2 and 1 for the two rounds of placing the starting settlements, 0 once the game has started"""
+        return self.game.phase
+
+    @init_state.setter
+    def init_state(self, init_state):
+        self.game.phase = init_state
+
+    @property
+    def state_hash(self):
+        """the game's Zobrist hash, used to look up states in the search tree"""
+        return self.game.state_hash
+
     @staticmethod
     def get_players_num():
         return 4
 
+    @staticmethod
+    def get_chance_outcomes():
+        """return the possible dice rolls at the end of a turn and their probabilities, as (dice, probability) pairs"""
+        return Catan.DICE_OUTCOMES
+
+    @staticmethod
+    def is_chance_action(action):
+        """return whether the action's outcome depends on a dice roll, i.e. it ends the turn"""
+        return action[0] == 4
+
     @staticmethod
     def get_state_size():
         return 160
@@ -110,8 +145,10 @@ class Catan(object):
             to_steal_from.remove_resources({resource: 1})
             print("Stole 1 %s for player %d" % (resource, p + 1))
 
-    def roll_dice(self):
-        dice = random.randint(1, 6) + random.randint(1, 6)
+    def roll_dice(self, dice=None):
+        """roll the dice and give out the resources, or use the given roll instead of rolling"""
+        if dice is None:
+            dice = random.randint(1, 6) + random.randint(1, 6)
         if dice == 7:
             # TBA
             pass
@@ -121,11 +158,11 @@ class Catan(object):
         self.dice = dice
         return dice
 
-    def end_turn(self):
+    def end_turn(self, dice=None):
         self.cur_id_player = (self.cur_id_player + 1) % len(self.game.players)
         self.current_player = self.game.players[self.cur_id_player]
 
-        self.roll_dice()
+        self.roll_dice(dice)
 
     def heuristic(self, state):
         heur = Tensor([0, 0, 0, 0])
@@ -145,6 +182,16 @@ class Catan(object):
             heur[p.id] = h
         return heur
 
+    def snapshot(self):
+        """return a snapshot of the game, which is much faster to take and restore than get_state/set_state"""
+        return self.game.snapshot(), self.cur_id_player, self.dice, self.picked_settl_coo, self.init_state
+
+    def restore(self, snapshot):
+        """change the game back to the snapshot given"""
+        game, self.cur_id_player, self.dice, self.picked_settl_coo, self.init_state = snapshot
+        self.game.restore(game)
+        self.current_player = self.game.players[self.cur_id_player]
+
     def set_state(self, state):
         """change the state of the game to the given state"""
         state = state.numpy()
@@ -169,7 +216,7 @@ class Catan(object):
 
         self.picked_settl_coo = None if state[3] == 0 else 1
 
-        self.init_state = state[4]
+        self.init_state = int(state[4])
 
         # if self.is_init_state():
         #     if self.picked_settl_coo is not None:
@@ -195,7 +242,11 @@ class Catan(object):
                         continue
                     else: # downgrade city to settlement
                         # v.building.owner.add_resources(v.building.building_type.get_required_resources())
-                        self.game.board.intersections[k].building.building_type = BuildingType(type)
+                        self.game.board.remove_intersection_building(k)
+                        self.game.board.add_intersection_building(player, k, BuildingType.SETTLEMENT,
+                                                                  ensure_connected=False)
+                        if BuildingType(type) is BuildingType.CITY:
+                            self.game.board.add_intersection_building(player, k, BuildingType.CITY)
 
                 elif type == 1:
                     self.game.build_settlement(player, k, cost_resources=(not self.is_init_state()))
@@ -206,7 +257,7 @@ class Catan(object):
             elif v.building is not None:
                 # if not self.is_init_state():
                 #     v.building.owner.add_resources(v.building.building_type.get_required_resources())
-                v.building = None
+                self.game.board.remove_intersection_building(k)
             i += 1
 
         for k, v in self.game.board.paths.items():
@@ -218,20 +269,20 @@ class Catan(object):
                         i += 1
                         continue
                     else:
-                        self.game.board.paths[k].building.owner = player
-                        self.game.board.paths[k].building.building_type = BuildingType(0)
+                        self.game.board.remove_path_building(k)
+                        self.game.board.add_path_building(player, BuildingType.ROAD, k, ensure_connected=False)
                 else:
                     # self.game.board.paths[k].building = PathBuilding(player, BuildingType.ROAD, k)
                     self.game.build_road(player, k, cost_resources=(not self.is_init_state()))
             elif v.building is not None:
                 if not self.is_init_state():
                     v.building.owner.add_resources(v.building.building_type.get_required_resources())
-                v.building = None
+                self.game.board.remove_path_building(k)
             i += 1
 
         for p in self.game.players:
-            for r, n in p.resources.items():
-                p.resources[r] = state[i]
+            for r in Resource:
+                p.set_resources({r: int(state[i])})
                 i += 1
 
         for c, harbor in self.game.board.harbors.items():
@@ -293,20 +344,15 @@ class Catan(object):
 
         #   intersections:
         # intersections = [[i.coords.q, i.coords.r, i.building] for i in self.game.board.intersections.values()]
-        for i in self.game.board.intersections.values():
-            structure_type = 0
-            if i.building is not None:
-                structure_type = i.building.owner.id * 10 + i.building.building_type.value
-            s = np.append(s, structure_type)
+        # read straight from the board's arrays, which are in the same order as board.intersections/board.paths
+        board = self.game.board
+        ids = np.array([p.id for p in board.players])
+        owners = board.intersection_owners
+        s = np.append(s, np.where(owners >= 0, ids[owners] * 10 + board.intersection_types, 0))
 
         #   paths:
         # paths = [b.building.owner for h, b in self.game.board.paths.items()]
-
-        for h, b in self.game.board.paths.items():
-            path_owner = 0
-            if b.building is not None:
-                path_owner = b.building.owner.id + 1
-            s = np.append(s, path_owner)
+        s = np.append(s, np.where(board.path_owners >= 0, ids[board.path_owners] + 1, 0))
 
         # robber = [self.game.board.robber.q, self.game.board.robber.r]
         # s = np.append(s, robber)
@@ -338,17 +384,42 @@ class Catan(object):
 
         return torch.tensor(s, dtype=torch.float)
 
+    def order_by_production(self, coords):
+        """return the intersection coords sorted by their expected production, most productive first"""
+        board = self.game.board
+        scores = board.get_expected_production().sum(axis=1)
+        return sorted(coords, key=lambda c: -scores[board.topology.intersection_indices[c]])
+
+    def get_action_priors(self, actions):
+        """return a cheap estimate of how good each action is, used to decide which actions to search first.
+        cities come before settlements, then roads, then ending the turn and then trades, as when pruning, and within
+        each of those the actions that build on or towards more productive intersections come first"""
+        board = self.game.board
+        scores = board.get_expected_production().sum(axis=1)
+        priors = []
+        for action in actions:
+            a = action[0].value if hasattr(action[0], 'value') else action[0]
+            if a == 2 or a == 1:  # city or settlement
+                priors.append(a + 1 + scores[board.topology.intersection_indices[action[1]]])
+            elif a == 0:  # road
+                priors.append(1 + max(scores[i] for i in board.topology.path_intersections[action[1]]))
+            elif a == 4:  # end turn
+                priors.append(0.5)
+            else:  # trade
+                priors.append(0)
+        return priors
+
     def get_actions(self, prune=True):
         """return a list of all the actions"""
         available_actions = []
         if self.is_init_state():
             if self.picked_settl_coo is None:
                 valid_coords = self.game.board.get_valid_settlement_coords(self.current_player, ensure_connected=False)
-                for c in valid_coords:
+                for c in self.order_by_production(valid_coords):
                     available_actions.append((BuildingType.SETTLEMENT, c))
             else:
-                road_options = self.game.board.get_valid_road_coords(self.current_player,
-                                                                     connected_intersection=self.picked_settl_coo)
+                road_options = self.game.board.get_valid_road_ids(self.current_player,
+                                                                  connected_intersection=self.picked_settl_coo)
                 for r in road_options:
                     available_actions.append((BuildingType.ROAD, r))
 
@@ -364,14 +435,14 @@ class Catan(object):
             if (len(available_actions) == 0 or prune is False) and self.current_player.has_resources(BuildingType.SETTLEMENT.get_required_resources()):
                 # Get the valid settlement coords
                 valid_coords = self.game.board.get_valid_settlement_coords(self.current_player)
-                for c in valid_coords:
+                for c in self.order_by_production(valid_coords):
                     available_actions.append((BuildingType.SETTLEMENT, c))
 
             if len(available_actions) == 0 or prune is False:
                 # build road
                 if self.current_player.has_resources(BuildingType.ROAD.get_required_resources()):
-                    # Get the valid road coords
-                    valid_coords = self.game.board.get_valid_road_coords(self.current_player)
+                    # Get the valid road ids
+                    valid_coords = self.game.board.get_valid_road_ids(self.current_player)
                     for c in valid_coords:
                         available_actions.append((BuildingType.ROAD, c))
 
@@ -383,7 +454,8 @@ class Catan(object):
 
         return available_actions
 
-    def make_action(self, action):
+    def make_action(self, action, dice=None):
+        """make the action, using the given dice roll if the action ends the turn rather than rolling"""
         reward = [0, 0, 0, 0]
 
         if hasattr(action[0], 'value'):
@@ -426,12 +498,12 @@ class Catan(object):
 
         elif a == 3:
             trade = dict(action[1])
-            self.current_player.add_resources(trade)
+            self.game.trade(self.current_player, trade)
             valid_coords = self.game.board.get_valid_settlement_coords(self.current_player, ensure_connected=True)
             reward[self.cur_id_player] = 1*(len(valid_coords) == 0)
 
         elif a == 4:
-            self.end_turn()
+            self.end_turn(dice)
 
         if self.is_over():
             players = self.game.players
@@ -0,0 +1,129 @@
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+import torch
+
+
+class InferenceServer:
+    """
+    evaluates states for many concurrent searches with one model. searches submit states and wait on futures, while a
+    background thread groups the waiting requests into batches and runs the model once per batch. a batch is run once
+    it has max_batch_size states, or timeout seconds after its first state arrived.
+    the server has a forward method like the model's, so it can be used as an agent's model, and every game running in
+    its own thread then shares the batches
+    """
+
+    def __init__(self, model, max_batch_size=64, timeout=0.002):
+        """
+        :param model: the model, e.g. an MLP
+        :param max_batch_size: the most states to evaluate at once
+        :param timeout: the longest time in seconds to wait for a batch to fill up
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+        self.requests = queue.Queue()
+        # how many batches there have been of each size, and how many requests were waiting when each batch started
+        self.batch_sizes = Counter()
+        self.queue_depths = Counter()
+        # held while checking that the server is open and queuing a request, so that no request is queued after the
+        # request that stops the server
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def submit(self, state):
+        """
+        :param state: a state tensor
+        :return: a Future of the model's output for the state
+        :raises RuntimeError: if the server has been closed
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The inference server has been closed")
+            self.requests.put((state, future))
+        return future
+
+    def forward(self, x):
+        """
+        evaluate a state, or a batch of states, waiting for the result
+        :param x: a state tensor, or a tensor of shape (N, D) of N states
+        :return: the model's output
+        """
+        if x.dim() == 1:
+            return self.submit(x).result()
+        futures = [self.submit(state) for state in x]
+        return torch.stack([future.result() for future in futures])
+
+    def close(self):
+        """
+        stop the server once the requests already submitted have been evaluated. any requests the server couldn't
+        evaluate fail with a RuntimeError rather than being left waiting
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self.requests.put(None)
+        self._thread.join()
+        while True:
+            try:
+                request = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                request[1].set_exception(RuntimeError("The inference server was closed before the request was served"))
+
+    def get_stats(self):
+        """
+        :return: the number of batches and states evaluated, the mean batch size, and the histograms of the batch sizes
+        and queue depths, as dicts of the number of batches for each size or depth
+        """
+        batches = sum(self.batch_sizes.values())
+        states = sum(size * n for size, n in self.batch_sizes.items())
+        return dict(batches=batches,
+                    states=states,
+                    mean_batch_size=states / batches if batches else 0,
+                    batch_sizes=dict(sorted(self.batch_sizes.items())),
+                    queue_depths=dict(sorted(self.queue_depths.items())))
+
+    def _serve(self):
+        closing = False
+        while not closing:
+            request = self.requests.get()
+            if request is None:
+                return
+            self.queue_depths[self.requests.qsize() + 1] += 1
+            batch = [request]
+            deadline = time.perf_counter() + self.timeout
+            while len(batch) < self.max_batch_size:
+                try:
+                    request = self.requests.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                if request is None:
+                    closing = True
+                    break
+                batch.append(request)
+            self.batch_sizes[len(batch)] += 1
+
+            try:
+                with torch.no_grad():
+                    outputs = self.model.forward(torch.stack([state for state, future in batch]))
+            except Exception as e:
+                for state, future in batch:
+                    future.set_exception(e)
+                continue
+            for (state, future), output in zip(batch, outputs):
+                future.set_result(output)
@@ -1,7 +1,7 @@
 import os.path
 
 import matplotlib.pyplot as plt
-from mcts import mcts_get_best_action
+from mcts import mcts_get_best_action, MCTSTree
 from mlp import MLP
 from game import Game
 from catan_wrp import Catan
@@ -109,6 +109,8 @@ def train_agent(games_num, model_path):
         print(f'_________________game {i}/{games_num}________________')
 
         catan_game = Catan()
+        # keep the subtree of each chosen action for the next search
+        tree = MCTSTree()
 
         ds = Dataset(hp_model_training['batch_size'], hp_model_training['valid_ratio'], hp_model_training['test_ratio'])
 
@@ -117,7 +119,8 @@ def train_agent(games_num, model_path):
         while True:
             turns_num += 1
 
-            best_action = mcts_get_best_action(catan_game, models, hp_mcts['c'], hp_mcts['d'], hp_mcts['iterations_num'])
+            best_action = mcts_get_best_action(catan_game, models, hp_mcts['c'], hp_mcts['d'], hp_mcts['iterations_num'],
+                                               tree=tree)
             print("Player " + str(catan_game.get_turn() + 1) + ", action:" + str(best_action))
 
             reward = catan_game.make_action(best_action)
@@ -152,12 +155,17 @@ def test_agent(games_num):
     for i in range(1, games_num + 1):
         print(f'_________________game {i}/{games_num}________________')
         catan_game = Catan()
+        # keep the subtree of each chosen action for the next search, in a tree for each model so that a search never
+        # starts from values that were estimated with the other model
+        trees = {id(model): MCTSTree() for model in models}
         actions_num = 0
         turns_num = 0
         while True:
             actions_num += 1
 
-            best_action = mcts_get_best_action(catan_game, models, hp_mcts['c'], hp_mcts['d'], hp_mcts['iterations_num'])
+            tree = trees[id(models[catan_game.cur_id_player])]
+            best_action = mcts_get_best_action(catan_game, models, hp_mcts['c'], hp_mcts['d'], hp_mcts['iterations_num'],
+                                               tree=tree)
             print("Player " + str(catan_game.get_turn() + 1) + ", action:" + str(best_action))
 
             reward = catan_game.make_action(best_action)
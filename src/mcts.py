@@ -1,10 +1,21 @@
-import copy
+import math
+import random
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
 import numpy as np
 import torch
 
+from array_tree import ArrayTree
+
 STATE_NODE = 0
 ACTION_NODE = 1
 
+# the ways a full transposition table can make room for a new state node
+REPLACE_LRU = 0  # evict the least recently used state node
+REPLACE_DEEPEST = 1  # evict the state node furthest from the root, keeping the ones with more search below them
+
 
 class MCTSNode:
     def __init__(self, node_type, parent, turn):
@@ -16,49 +27,186 @@ class MCTSNode:
         self.sons = {}
 
 
-def iteration(root, game, agent, c, d):
+class TranspositionTable:
+    """
+    a bounded table of the state nodes of the MCTS, keyed by the game's state hash. different orders of actions that
+    reach the same position (e.g. building road A then road B, or B then A) share one state node and its statistics,
+    and the table evicts state nodes once it is full so memory stays flat over long searches
+    """
+
+    def __init__(self, capacity, replacement=REPLACE_LRU):
+        """
+        :param capacity: the most state nodes to keep, at least 1
+        :param replacement: REPLACE_LRU or REPLACE_DEEPEST
+        """
+        if capacity < 1:
+            raise ValueError("A transposition table needs room for at least one state node")
+        self.capacity = capacity
+        self.replacement = replacement
+        self.nodes = OrderedDict()
+        self.depths = {}
+        # the hashes of the state nodes at each depth, to find the deepest ones quickly
+        self.depth_buckets = {}
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def get(self, state_hash):
+        """
+        :param state_hash: the game's state hash
+        :return: the state node for the state, or None if it isn't in the table
+        """
+        node = self.nodes.get(state_hash)
+        if node is not None and self.replacement == REPLACE_LRU:
+            self.nodes.move_to_end(state_hash)
+        return node
+
+    def put(self, state_hash, node, depth):
+        """
+        add a state node to the table, evicting another one if the table is full
+        :param state_hash: the game's state hash
+        :param node: the state node
+        :param depth: the number of actions between the root of the current search and the state. the root is put
+        again at depth 0 at the start of every search, so the depths stored by earlier searches only go stale for the
+        nodes the search has moved past
+        :return: whether the node was added. with REPLACE_DEEPEST, a node deeper than every node in a full table isn't
+        """
+        if state_hash in self.nodes:
+            self._remove(state_hash)
+        if len(self.nodes) >= self.capacity:
+            if self.replacement == REPLACE_LRU:
+                self._remove(next(iter(self.nodes)))
+            else:
+                deepest = max(self.depth_buckets)
+                if deepest < depth:
+                    return False
+                self._remove(next(iter(self.depth_buckets[deepest])))
+        self.nodes[state_hash] = node
+        self.depths[state_hash] = depth
+        self.depth_buckets.setdefault(depth, {})[state_hash] = None
+        return True
+
+    def _remove(self, state_hash):
+        del self.nodes[state_hash]
+        depth = self.depths.pop(state_hash)
+        bucket = self.depth_buckets[depth]
+        del bucket[state_hash]
+        if not bucket:
+            del self.depth_buckets[depth]
+
+
+class MCTSTree:
+    """
+    keeps the subtree of the action chosen by mcts_get_best_action, so that the next search can start from the state
+    the game reaches after that action, with its visit counts and values, rather than from an empty tree
+    """
+
+    def __init__(self):
+        self.action_node = None
+
+    def get_root(self, game):
+        """
+        :param game: the game after the chosen action was made
+        :return: the state node of the game's current state if it was searched under the chosen action (for an end of
+        turn, the state with the dice that were actually rolled), otherwise None
+        """
+        if self.action_node is None:
+            return None
+        root = self.action_node.sons.get(game.state_hash)
+        self.action_node = None
+        if root is not None:
+            # let the rest of the old tree be freed
+            root.parent = None
+        return root
+
+
+def get_widening_limit(n, widening):
+    """
+    :param n: the visit count of a state node
+    :param widening: (C, alpha) for progressive widening, or None to let every child be selected
+    :return: how many of the node's children can be selected, k = C * n ** alpha, and always at least one
+    """
+    if widening is None:
+        return math.inf
+    widening_c, alpha = widening
+    return max(1, math.ceil(widening_c * n ** alpha))
+
+
+def order_by_prior(game, actions, widening):
+    """
+    :param actions: the actions of a state
+    :param widening: (C, alpha) for progressive widening, or None
+    :return: the actions sorted by the game's prior, best first, so that progressive widening exposes the most
+    promising ones first. unchanged if not widening
+    """
+    if widening is None:
+        return actions
+    priors = game.get_action_priors(actions)
+    return [actions[i] for i in sorted(range(len(actions)), key=lambda i: priors[i], reverse=True)]
+
+
+def iteration(root, game, agent, c, d, table=None, widening=None):
     """
     make one iteration of the MCTS
     :param game: the current game
     :param agent: the agent who activates the method
     :c the weight of the exploration part in the UCT
     :d the weight of the heuristic
+    :param table: a TranspositionTable holding the state nodes, or None to keep them in the tree
+    :param widening: (C, alpha) to only let the first k = C * N ** alpha children of a state node visited N times be
+    selected, with the children ordered by the game's prior. None to let every child be selected
     :return: void
     """
 
-    original_state = game.get_state()
+    original_state = game.snapshot()
+    if table is not None:
+        # keep the root the most recently used state node, so that LRU replacement never evicts it
+        table.get(game.state_hash)
 
-    # returns the reward if it's the end of the game, the selected action, and the given state after playing this action
-    reward, action_leaf, new_state = selection(root, game, c)
+    # returns the reward if it's the end of the game, the nodes down to the selected action, and the hash of the given
+    # state after playing this action
+    reward, path, new_state_hash = selection(root, game, c, table, widening)
 
     if not game.is_over():
-        action_leaf = expansion(action_leaf, new_state, game, agent.prune)
+        if new_state_hash is not None:
+            action_leaf = expansion(path[-1], new_state_hash, game, agent.prune, table, len(path) // 2, widening)
+            path += [action_leaf.parent, action_leaf]
+        reward = play_rollout(game, agent, reward)
 
+    if not game.is_over():
+        new_state = game.get_state()
         # adding the weighted heuristic value to the predicted reward from the DNN
         reward = d * game.heuristic(new_state) + agent.model.forward(new_state)
 
-    back_propagation(action_leaf, reward)
+    back_propagation(path, reward)
 
     # back to the original state of the game
-    game.set_state(original_state)
+    game.restore(original_state)
 
 
-def selection(root, game, c):
+def selection(root, game, c, table=None, widening=None):
     """
     :param root: the root of the MCTS
     :param game: the game simulator in initial state
     :param c: the exploration exploitation factor
-    :return: reward, leaf, new_state, where the leaf is an action node, the new_state is the state node that is not
-    in the tree yet, and the reward is the given reward of playing the leaf action.
-    if the reward is not None, then the new_state is None because it's the end of the game.
+    :param table: a TranspositionTable holding the state nodes, or None to keep them in the tree
+    :param widening: (C, alpha) for progressive widening, or None
+    :return: reward, path, new_state_hash, where the path is the nodes from the root down to the selected leaf, which
+    is an action node, the new_state_hash is the hash of the state that is not in the tree yet, and the reward is the
+    given reward of playing the leaf action.
+    if the reward is not None, then the new_state_hash is None because it's the end of the game. it's also None if the
+    leaf leads back to a state already on the path, which can happen with a transposition table
     """
     reward = [0] * game.get_players_num()
+    path = [root]
+    # the hashes of the states on the path, starting with the root's, to catch actions that lead back to one of them
+    path_hashes = {game.state_hash}
 
     while True:
         if root.type == STATE_NODE:
             best_action = None
             best_action_uct = -np.inf
-            for action in root.sons:
+            for action in islice(root.sons, min(len(root.sons), get_widening_limit(root.N, widening))):
                 action_node = root.sons[action]
                 if action_node.N == 0:
                     uct = np.inf
@@ -68,31 +216,46 @@ def selection(root, game, c):
                     best_action_uct = uct
                     best_action = action
             root = root.sons[best_action]
+            path.append(root)
             reward = game.make_action(tuple(best_action))
         else:
             if not game.is_over():
-                state = game.get_state()
-                if tuple(np.array(state)) in root.sons:
-                    s1 = root.sons[tuple(np.array(state))]
+                # state nodes are keyed by the game's Zobrist hash, so finding one is a single dict lookup
+                state_hash = game.state_hash
+                if table is None:
+                    s1 = root.sons.get(state_hash)
+                else:
+                    if state_hash in path_hashes:
+                        return reward, path, None
+                    path_hashes.add(state_hash)
+                    s1 = table.get(state_hash)
+                if s1 is not None:
                     root = s1
+                    path.append(root)
                 else:
-                    return reward, root, state
+                    return reward, path, state_hash
             else:
-                return reward, root, None
+                return reward, path, None
 
 
-def expansion(action_leaf, new_state, game, prune=True):
+def expansion(action_leaf, new_state_hash, game, prune=True, table=None, depth=0, widening=None):
     """
     param action_leaf: a leaf of the tree
-    param new_state: the new state for insertion
+    param new_state_hash: the hash of the new state for insertion
     param game: the game simulation
     param prune: prune less attractive actions
+    param table: a TranspositionTable to add the new state node to, or None to add it to the tree
+    param depth: the number of actions between the root and the new state
+    param widening: (C, alpha) for progressive widening, in which case the actions are ordered by the game's prior
     return: a random action of the new_state
     """
 
     new_state_node = MCTSNode(STATE_NODE, action_leaf, game.get_turn())
-    action_leaf.sons[tuple(np.array(np.array(new_state)))] = new_state_node
-    actions = game.get_actions(prune)
+    if table is None:
+        action_leaf.sons[new_state_hash] = new_state_node
+    else:
+        table.put(new_state_hash, new_state_node, depth)
+    actions = order_by_prior(game, game.get_actions(prune), widening)
     for action in actions:
         action_node = MCTSNode(ACTION_NODE, new_state_node, new_state_node.turn)
         new_state_node.sons[action] = action_node
@@ -100,42 +263,401 @@ def expansion(action_leaf, new_state, game, prune=True):
     return new_state_node.sons[best_action]
 
 
-def back_propagation(action_leaf, reward):
+def play_rollout(game, agent, reward):
+    """
+    play on from a leaf with the agent's rollout, if it has one, so that the leaf is evaluated at the state reached
+    :param game: the game, at the leaf's state
+    :param agent: the agent who activates the method
+    :param reward: the reward of the leaf's action
+    :return: the reward of the last action made, which is the final reward if the rollout ended the game
+    """
+    rollout = getattr(agent, 'rollout', None)
+    if rollout is None:
+        return reward
+    rollout_reward = rollout.play(game)
+    return reward if rollout_reward is None else rollout_reward
+
+
+def back_propagation(path, reward):
     """
-    param action_leaf: the leaf of the tree
+    param path: the nodes from the root down to the leaf of the tree. with a transposition table a state node can be
+    reached from more than one parent, so the path is followed rather than the parents
     param reward: the reward of each player
     return: void
     """
-    node = action_leaf
-    while node:
+    for node in path:
         node.N += 1
         if sum(reward) != 0:
             node.w += reward[node.turn] / sum(reward)
-        node = node.parent
 
 
-def mcts_get_best_action(game, agents, c, d, iterations_num):
+def select_uct(n, w, parent_n, c):
+    """
+    pick the child with the highest UCT, computed for all the children of a node at once
+    :param n: the visit counts of the children
+    :param w: the value sums of the children, for the player whose turn it is
+    :param parent_n: the visit count of the node
+    :param c: the exploration exploitation factor
+    :return: the position of the chosen child in the arrays. unvisited children count as having an infinite UCT, so
+    the first of them is picked before any visited child
+    """
+    visited = n > 0
+    if not visited.all():
+        # the first unvisited child, found from the mask without dividing by its zero visit count
+        return int(visited.argmin())
+    uct = w / n
+    uct += c * np.sqrt(math.log(parent_n) / n)
+    return int(uct.argmax())
+
+
+def array_iteration(tree, game, agent, c, d, chance_nodes=False, widening=None):
+    """
+    make one iteration of the MCTS on an ArrayTree
+    :param tree: the tree, with its root at the current state of the game
+    :param game: the current game
+    :param agent: the agent who activates the method
+    :c the weight of the exploration part in the UCT
+    :d the weight of the heuristic
+    :param chance_nodes: whether to treat the actions that roll the dice as chance nodes, see array_selection
+    :param widening: (C, alpha) for progressive widening, see iteration
+    :return: void
+    """
+
+    original_state = game.snapshot()
+
+    reward, path, new_state_hash, outcome = array_selection(tree, game, c, chance_nodes, widening)
+
+    if not game.is_over():
+        action_leaf = array_expansion(tree, path[-1], new_state_hash, game, agent.prune, outcome, widening)
+        path += [int(tree.parent[action_leaf]), action_leaf]
+        reward = play_rollout(game, agent, reward)
+
+    if not game.is_over():
+        new_state = game.get_state()
+        # adding the weighted heuristic value to the predicted reward from the DNN
+        reward = d * game.heuristic(new_state) + agent.model.forward(new_state)
+
+    array_back_propagation(tree, path, reward, get_chance_probabilities(game) if chance_nodes else None)
+
+    # back to the original state of the game
+    game.restore(original_state)
+
+
+def array_batch_iteration(tree, game, agent, c, d, batch_size, virtual_loss=1, chance_nodes=False, widening=None):
+    """
+    make batch_size iterations of the MCTS on an ArrayTree, evaluating all of their leaves with one call to the model.
+    each selected path is given a virtual loss, i.e. extra visits with no reward, until the batch is evaluated, so that
+    the later selections in the batch are steered down other paths
+    :param tree: the tree, with its root at the current state of the game
+    :param game: the current game
+    :param agent: the agent who activates the method
+    :c the weight of the exploration part in the UCT
+    :d the weight of the heuristic
+    :param batch_size: the number of leaves to evaluate together
+    :param virtual_loss: the number of visits each selection adds to its path until it is backed up
+    :param chance_nodes: whether to treat the actions that roll the dice as chance nodes, see array_selection
+    :param widening: (C, alpha) for progressive widening, see iteration
+    :return: void
+    """
+
+    original_state = game.snapshot()
+    # the path, reward and whether the reward needs the model's prediction added, for each leaf
+    leaves = []
+    states = []
+    for i in range(batch_size):
+        reward, path, new_state_hash, outcome = array_selection(tree, game, c, chance_nodes, widening)
+
+        if not game.is_over():
+            action_leaf = array_expansion(tree, path[-1], new_state_hash, game, agent.prune, outcome, widening)
+            path += [int(tree.parent[action_leaf]), action_leaf]
+            reward = play_rollout(game, agent, reward)
+
+        evaluate = not game.is_over()
+        if evaluate:
+            new_state = game.get_state()
+            states.append(new_state)
+            # the model's prediction is added once the whole batch has been evaluated
+            reward = d * game.heuristic(new_state)
+
+        tree.N[path] += virtual_loss
+        leaves.append((path, reward, evaluate))
+        game.restore(original_state)
+
+    if states:
+        with torch.no_grad():
+            predictions = iter(agent.model.forward(torch.stack(states)))
+    probabilities = get_chance_probabilities(game) if chance_nodes else None
+    for path, reward, evaluate in leaves:
+        tree.N[path] -= virtual_loss
+        if evaluate:
+            reward = reward + next(predictions)
+        array_back_propagation(tree, path, reward, probabilities)
+
+
+def array_selection(tree, game, c, chance_nodes=False, widening=None):
+    """
+    :param tree: the ArrayTree
+    :param game: the game simulator in initial state
+    :param c: the exploration exploitation factor
+    :param chance_nodes: whether to treat the actions that roll the dice as chance nodes. rather than rolling, the
+    outcome chosen is the one furthest below its share of the chance node's visits, so the outcomes are visited in
+    proportion to their probabilities without the noise of sampling them
+    :param widening: (C, alpha) for progressive widening, see iteration
+    :return: reward, path, new_state_hash, outcome, like selection, except that the path is of node indices. the
+    outcome is the index of the dice roll that led to the new state if the leaf is a chance node, and None otherwise
+    """
+    reward = [0] * game.get_players_num()
+    node = tree.root
+    path = [node]
+    if chance_nodes:
+        outcomes = game.get_chance_outcomes()
+        probabilities = get_chance_probabilities(game)
+
+    while True:
+        first = tree.first_child[node]
+        last = first + min(tree.children_num[node], get_widening_limit(tree.N[node], widening))
+        best_action = int(first) + select_uct(tree.N[first:last], tree.w[first:last, tree.turn[node]], tree.N[node], c)
+        path.append(best_action)
+        action = tuple(tree.get_action(best_action))
+        outcome = None
+        if chance_nodes and game.is_chance_action(action):
+            counts = tree.chance_counts.get(best_action)
+            if counts is None:
+                counts = tree.chance_counts[best_action] = np.zeros(len(outcomes))
+            outcome = int(np.argmax(probabilities * (counts.sum() + 1) - counts))
+            counts[outcome] += 1
+            reward = game.make_action(action, outcomes[outcome][0])
+        else:
+            reward = game.make_action(action)
+        if game.is_over():
+            return reward, path, None, None
+        state_hash = game.state_hash
+        node = tree.state_sons.get((best_action, state_hash))
+        if node is None:
+            return reward, path, state_hash, outcome
+        if outcome is not None:
+            # different rolls can lead to the same state, e.g. when none of them produce anything
+            tree.chance_sons.setdefault(best_action, {})[outcome] = node
+        path.append(node)
+
+
+def array_expansion(tree, action_leaf, new_state_hash, game, prune=True, outcome=None, widening=None):
+    """
+    param tree: the ArrayTree
+    param action_leaf: the index of a leaf of the tree
+    param new_state_hash: the hash of the new state for insertion
+    param game: the game simulation
+    param prune: prune less attractive actions
+    param outcome: the index of the dice roll that led to the new state, if the leaf is a chance node
+    param widening: (C, alpha) for progressive widening, in which case the actions are ordered by the game's prior
+    return: the index of the first action of the new state
+    """
+    actions = order_by_prior(game, game.get_actions(prune), widening)
+    new_state_node = tree.add_state_node(action_leaf, game.get_turn(), actions, new_state_hash)
+    if outcome is not None:
+        tree.chance_sons.setdefault(action_leaf, {})[outcome] = new_state_node
+    return int(tree.first_child[new_state_node])
+
+
+def array_back_propagation(tree, path, reward, chance_probabilities=None):
+    """
+    param tree: the ArrayTree
+    param path: the indices of the nodes from the root down to the leaf of the tree
+    param reward: the reward of each player
+    param chance_probabilities: the probability of each dice roll, when searching with chance nodes. the value of each
+    chance node on the path is then set to the expectation of its outcomes' values, rather than the sum of the rewards
+    that happened to be backed up through it
+    return: void
+    """
+    if isinstance(reward, torch.Tensor):
+        reward = reward.detach().numpy()
+    reward = np.asarray(reward, dtype=float)
+    tree.N[path] += 1
+    if reward.sum() != 0:
+        tree.w[path] += reward / reward.sum()
+    if chance_probabilities is not None:
+        for node in path:
+            sons = tree.chance_sons.get(node)
+            if sons:
+                states = np.fromiter(sons.values(), np.int64, len(sons))
+                n = tree.N[states]
+                visited = n > 0
+                p = chance_probabilities[list(sons)][visited]
+                if visited.any():
+                    values = tree.w[states[visited]] / n[visited, None]
+                    tree.w[node] = p @ values / p.sum() * tree.N[node]
+
+
+def get_chance_probabilities(game):
+    """
+    :return: an array of the probability of each of the game's chance outcomes
+    """
+    return np.array([probability for outcome, probability in game.get_chance_outcomes()])
+
+
+def array_get_best_action(game, agents, c, d, iterations_num, tree, batch_size=1, chance_nodes=False,
+                          widening=None):
+    """
+    mcts_get_best_action on an ArrayTree
+    :param tree: the ArrayTree. the subtree of the chosen action is kept, and the next call starts from it if the
+    state the game reaches is in it
+    :param batch_size: the number of leaves to evaluate with each call to the model, see array_batch_iteration
+    :param chance_nodes: whether to treat the actions that roll the dice as chance nodes, see array_selection
+    :param widening: (C, alpha) for progressive widening, see iteration
+    :return: the action with the highest value after iteration_num iterations
+    """
+
+    agent = agents[game.cur_id_player]
+    actions = game.get_actions(agent.prune)
+
+    root = -1
+    if tree.chosen >= 0:
+        root = tree.state_sons.get((tree.chosen, game.state_hash), -1)
+    if root >= 0:
+        tree.reroot(root)
+    else:
+        tree.clear()
+        tree.root = tree.add_state_node(-1, game.get_turn(), order_by_prior(game, actions, widening))
+
+    if len(actions) == 1:
+        tree.chosen = int(tree.first_child[tree.root])
+        return actions[0]
+
+    if batch_size > 1:
+        for start in range(0, iterations_num, batch_size):
+            array_batch_iteration(tree, game, agent, c, d, min(batch_size, iterations_num - start),
+                                  chance_nodes=chance_nodes, widening=widening)
+    else:
+        for i in range(iterations_num):
+            array_iteration(tree, game, agent, c, d, chance_nodes, widening)
+
+    children = tree.get_children(tree.root)
+    values = tree.w[children.start:children.stop, tree.turn[tree.root]]
+    tree.chosen = children.start + int(np.argmax(values))
+    return tree.get_action(tree.chosen)
+
+
+def root_parallel_search(game, agents, c, d, iterations_num, seed, batch_size=1, chance_nodes=False, widening=None):
+    """
+    run one of the independent searches of root_parallel_get_best_action, in a worker process
+    :param seed: the seed for the worker's random number generators, so that each worker rolls different dice
+    :return: the action, visit count and value of each of the root's children
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+    # the workers already use every core between them
+    torch.set_num_threads(1)
+    tree = ArrayTree(game.get_players_num())
+    array_get_best_action(game, agents, c, d, iterations_num, tree, batch_size, chance_nodes, widening)
+    turn = tree.turn[tree.root]
+    return [(tree.get_action(i), int(tree.N[i]), float(tree.w[i, turn])) for i in tree.get_children(tree.root)]
+
+
+def root_parallel_get_best_action(game, agents, c, d, iterations_num, workers, pool=None, batch_size=1,
+                                  chance_nodes=False, widening=None):
+    """
+    mcts_get_best_action with root parallelization: each worker process searches its own copy of the game with its
+    own seed, and the visit counts and values of the root's children are added up across the workers
+    :param iterations_num: the number of MCTS iterations each worker makes
+    :param workers: the number of independent searches
+    :param pool: a ProcessPoolExecutor to run the searches in. if None, one is made for this call, which is slow to
+    start, so pass one in when calling this for every move
+    :param batch_size: the number of leaves each worker evaluates together
+    :param chance_nodes: whether the workers treat the actions that roll the dice as chance nodes
+    :param widening: (C, alpha) for progressive widening in the workers
+    :return: the action with the highest total value
+    """
+
+    agent = agents[game.cur_id_player]
+    actions = game.get_actions(agent.prune)
+
+    if len(actions) == 1:
+        return actions[0]
+
+    own_pool = pool is None
+    if own_pool:
+        pool = ProcessPoolExecutor(workers)
+    try:
+        futures = [
+            pool.submit(root_parallel_search, game, agents, c, d, iterations_num, random.getrandbits(32), batch_size,
+                        chance_nodes, widening)
+            for _ in range(workers)
+        ]
+        N = dict.fromkeys(actions, 0)
+        w = dict.fromkeys(actions, 0.0)
+        for future in futures:
+            for action, n, value in future.result():
+                N[action] += n
+                w[action] += value
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+    return max(actions, key=lambda action: (w[action], N[action]))
+
+
+def mcts_get_best_action(game, agents, c, d, iterations_num, table=None, tree=None, workers=1, pool=None,
+                         batch_size=1, chance_nodes=False, widening=None):
     """
     :param game: the game in the current state
     :param agents: the agent that use this method
     :param c: the exploration/exploitation factor
     :param iterations_num: the number of MCTS iterations
+    :param table: a TranspositionTable to share state nodes between transpositions, or None to search a plain tree.
+    the table can be passed to every call in a game, so that positions searched before keep their statistics
+    :param tree: an MCTSTree to pass to every call in a game, so that each search continues from the subtree of the
+    previous search's chosen action. an ArrayTree can be passed instead to keep the tree in numpy arrays, which uses
+    far less memory, though it can't be combined with a table
+    :param workers: the number of processes to search in parallel with root_parallel_get_best_action. each one makes
+    iterations_num iterations. a table or tree can't be used with more than one
+    :param pool: the ProcessPoolExecutor for root_parallel_get_best_action
+    :param batch_size: the number of leaves to evaluate together with array_batch_iteration. searches an ArrayTree,
+    making a new one if tree is None
+    :param chance_nodes: whether to treat the actions that roll the dice as chance nodes, backing up the expectation
+    over the dice rolls. like batch_size, searches an ArrayTree
+    :param widening: (C, alpha) to progressively widen the search, only letting the first k = C * N ** alpha actions of
+    a state visited N times be selected, best first by the game's prior. None to let every action be selected
     :return: the most visited action after iteration_num iterations
     """
 
-    root = MCTSNode(STATE_NODE, None, game.get_turn())
+    if workers > 1:
+        if table is not None or tree is not None:
+            raise ValueError("A transposition table or tree can't be shared between workers")
+        return root_parallel_get_best_action(game, agents, c, d, iterations_num, workers, pool, batch_size,
+                                             chance_nodes, widening)
+
+    if (batch_size > 1 or chance_nodes) and tree is None:
+        tree = ArrayTree(game.get_players_num())
+    if isinstance(tree, ArrayTree):
+        if table is not None:
+            raise ValueError("A transposition table can't be used with an ArrayTree")
+        return array_get_best_action(game, agents, c, d, iterations_num, tree, batch_size, chance_nodes, widening)
+
     agent = agents[game.cur_id_player]
     actions = game.get_actions(agent.prune)
 
+    root = None if tree is None else tree.get_root(game)
+    if root is None and table is not None:
+        root = table.get(game.state_hash)
+
     if len(actions) == 1:
+        if tree is not None and root is not None:
+            tree.action_node = root.sons.get(actions[0])
         return actions[0]
 
-    for action in actions:
-        son = MCTSNode(ACTION_NODE, root, game.get_turn())
-        root.sons[action] = son
+    if root is None:
+        root = MCTSNode(STATE_NODE, None, game.get_turn())
+        for action in order_by_prior(game, actions, widening):
+            son = MCTSNode(ACTION_NODE, root, game.get_turn())
+            root.sons[action] = son
+    if table is not None:
+        # the root is at depth 0 of this search even if an earlier search stored it deeper, so that REPLACE_DEEPEST
+        # never evicts it
+        table.put(game.state_hash, root, 0)
 
     for i in range(iterations_num):
-        iteration(root, game, agent, c, d)
+        iteration(root, game, agent, c, d, table, widening)
 
     best_action = None
     biggest_w = -np.inf
@@ -144,4 +666,6 @@ def mcts_get_best_action(game, agents, c, d, iterations_num):
         if w > biggest_w:
             biggest_w = w
             best_action = action
+    if tree is not None:
+        tree.action_node = root.sons[best_action]
     return best_action
@@ -0,0 +1,140 @@
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import torch
+
+from array_tree import ArrayTree
+from catan_wrp import Catan
+from inference_server import InferenceServer
+from mcts import mcts_get_best_action
+from mlp import MLP
+from rollout import GREEDY, RANDOM, Rollout
+
+
+class Agent:
+    def __init__(self, model, prune=True, rollout=None):
+        self.model = model
+        self.prune = prune
+        self.rollout = rollout
+
+
+def play(agents, c, d, iterations_num, moves_num, workers, pool, parallel_players):
+    """
+    play a game, with the players in parallel_players searching with root parallelization
+    :return: the time spent searching for each player, the number of searches for each player, and the victory points
+    of each player at the end
+    """
+    game = Catan()
+    search_time = [0.0] * game.get_players_num()
+    searches = [0] * game.get_players_num()
+    for _ in range(moves_num):
+        player = game.cur_id_player
+        parallel = player in parallel_players
+        start = time.perf_counter()
+        if parallel:
+            action = mcts_get_best_action(game, agents, c, d, iterations_num, workers=workers, pool=pool)
+        else:
+            # a fresh tree for each move, like each of the workers use
+            action = mcts_get_best_action(game, agents, c, d, iterations_num, tree=ArrayTree())
+        search_time[player] += time.perf_counter() - start
+        searches[player] += 1
+        game.make_action(action)
+        if game.is_over():
+            break
+    return search_time, searches, [game.game.get_victory_points(p) for p in game.game.players]
+
+
+def root_parallel_benchmark(games_num=4, moves_num=200, workers=4, c=1, d=3, iterations_num=50):
+    """
+    compare root-parallel MCTS against single process MCTS. player 1 searches with workers processes and the others
+    with one, each process making iterations_num iterations, so the parallel player searches workers times as many
+    iterations in about the same time. prints the iterations per second of each and the average victory points
+    """
+    torch.manual_seed(0)
+    model = MLP(Catan.get_state_size(), [20, Catan.get_players_num()], ['relu', 'none'])
+    agents = [Agent(model)] * Catan.get_players_num()
+    total_time = np.zeros((2, Catan.get_players_num()))
+    total_searches = np.zeros((2, Catan.get_players_num()))
+    points = np.zeros((2, Catan.get_players_num()))
+    with ProcessPoolExecutor(workers) as pool:
+        for i in range(games_num):
+            # play each game once with player 1 searching in parallel and once without, with the same seed
+            for parallel in (0, 1):
+                random.seed(i)
+                search_time, searches, vp = play(agents, c, d, iterations_num, moves_num, workers, pool,
+                                                 {0} if parallel else set())
+                total_time[parallel] += search_time
+                total_searches[parallel] += searches
+                points[parallel] += vp
+    for parallel in (0, 1):
+        processes = workers if parallel else 1
+        iterations = total_searches[parallel][0] * iterations_num * processes
+        print(f'player 1 with {processes} process(es): {iterations / total_time[parallel][0]:.0f} iterations/s, '
+              f'{total_time[parallel][0] / total_searches[parallel][0] * 1000:.0f} ms per move, '
+              f'average victory points {points[parallel][0] / games_num:.2f} against '
+              f'{points[parallel][1:].mean() / games_num:.2f}')
+
+
+def self_play(agents, c, d, iterations_num, moves_num):
+    """play moves_num moves of a game, searching a fresh tree for each one"""
+    game = Catan()
+    for _ in range(moves_num):
+        game.make_action(mcts_get_best_action(game, agents, c, d, iterations_num, tree=ArrayTree()))
+        if game.is_over():
+            break
+
+
+def inference_server_benchmark(games_num=16, moves_num=30, c=1, d=3, iterations_num=50):
+    """
+    play games_num games at once, each in its own thread, first with every game calling the model itself and then
+    with all of them sharing an InferenceServer. prints the moves per second of each and the server's statistics
+    """
+    torch.manual_seed(0)
+    model = MLP(Catan.get_state_size(), [20, Catan.get_players_num()], ['relu', 'none'])
+    for shared in (False, True):
+        server = InferenceServer(model, max_batch_size=games_num) if shared else None
+        agents = [Agent(server if shared else model)] * Catan.get_players_num()
+        random.seed(0)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(games_num) as threads:
+            for future in [threads.submit(self_play, agents, c, d, iterations_num, moves_num)
+                           for _ in range(games_num)]:
+                future.result()
+        moves_per_second = games_num * moves_num / (time.perf_counter() - start)
+        print(f'{"shared inference server" if shared else "model called by each game"}: '
+              f'{moves_per_second:.1f} moves/s')
+        if shared:
+            server.close()
+            print(server.get_stats())
+
+
+def rollout_benchmark(games_num=4, moves_num=30, plies=10, c=1, d=3, iterations_num=50):
+    """
+    play games_num games searching without rollouts, then with random and greedy rollouts of plies actions from each
+    leaf. prints the moves per second of each, and the plies per second of the rollouts
+    """
+    torch.manual_seed(0)
+    model = MLP(Catan.get_state_size(), [20, Catan.get_players_num()], ['relu', 'none'])
+    for name, rollout in (('no rollouts', None),
+                          ('random rollouts', Rollout(plies, RANDOM)),
+                          ('greedy rollouts', Rollout(plies, GREEDY))):
+        agents = [Agent(model, rollout=rollout)] * Catan.get_players_num()
+        random.seed(0)
+        start = time.perf_counter()
+        for _ in range(games_num):
+            self_play(agents, c, d, iterations_num, moves_num)
+        moves_per_second = games_num * moves_num / (time.perf_counter() - start)
+        print(f'{name}: {moves_per_second:.1f} moves/s' +
+              (f', {rollout.plies_per_second:.0f} plies/s' if rollout is not None else ''))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['server']:
+        inference_server_benchmark(*(int(a) for a in sys.argv[2:]))
+    elif sys.argv[1:2] == ['rollout']:
+        rollout_benchmark(*(int(a) for a in sys.argv[2:]))
+    else:
+        root_parallel_benchmark(*(int(a) for a in sys.argv[1:]))
@@ -1,4 +1,6 @@
-from typing import Dict, Set, Optional
+from typing import Dict, List, Set, Optional, Union
+from enum import Enum
+from numbers import Integral
 from random import shuffle
 
 from ._player import Player
@@ -6,8 +8,21 @@ from .board._board import Board
 from .board._coords import Coords
 from ._roll_yield import RollYield
 from .errors import NotEnoughResourcesError
+from ._resource import Resource
 from .board._building_type import BuildingType
 from ._development_card import DevelopmentCard
+from ._zobrist import ZobristFeature, zobrist_key
+
+
+class _JournalEntryType(Enum):
+    # The type of change recorded by an entry in the game's undo journal
+    SETTLEMENT = 0
+    CITY = 1
+    ROAD = 2
+    YIELD = 3
+    ROBBER = 4
+    DEVELOPMENT_CARD = 5
+    TRADE = 6
 
 
 class Game:
@@ -24,11 +39,19 @@ class Game:
                 have a road of at least 5 length
             largest_army_owner (Player): The player how has the largest army, or None if no players have played at least 3 knight cards
             development_card_deck (List[DevelopmentCard]): The deck of development cards
+            turn (int): The index of the player whose turn it is. Not used by the game itself, but included in
+                the state hash
+            phase (int): The phase of the game, e.g. placing the starting settlements. Like turn, this is only
+                kept for the state hash
+
+    Every change made through the game's methods is recorded in an undo journal, and can be reverted
+    with Game.undo.
     """
 
     def __init__(self, board: Board, num_players: Optional[int] = 4):
         self.board = board
         self.players = [Player(i) for i in range(num_players)]
+        self.board.register_players(self.players)
         self.longest_road_owner = None
         self.largest_army_owner = None
         self.development_card_deck = (
@@ -40,6 +63,155 @@ class Game:
         )
 
         shuffle(self.development_card_deck)
+        self._turn = 0
+        self._phase = 0
+        self._turn_hash = zobrist_key(ZobristFeature.TURN, 0) ^ zobrist_key(
+            ZobristFeature.PHASE, 0
+        )
+        # Each entry is a tuple of its type followed by the smallest amount of information needed to undo it
+        self._journal: List[tuple] = []
+
+    @property
+    def turn(self) -> int:
+        """The index of the player whose turn it is."""
+        return self._turn
+
+    @turn.setter
+    def turn(self, turn: int):
+        self._turn_hash ^= zobrist_key(ZobristFeature.TURN, self._turn) ^ zobrist_key(
+            ZobristFeature.TURN, turn
+        )
+        self._turn = turn
+
+    @property
+    def phase(self) -> int:
+        """The phase of the game."""
+        return self._phase
+
+    @phase.setter
+    def phase(self, phase: int):
+        self._turn_hash ^= zobrist_key(ZobristFeature.PHASE, self._phase) ^ zobrist_key(
+            ZobristFeature.PHASE, phase
+        )
+        self._phase = phase
+
+    @property
+    def state_hash(self) -> int:
+        """A 64 bit Zobrist hash of the game's state.
+
+        Covers the buildings, roads, robber, each player's resources, the turn, the phase and the longest road
+        owner. Each part is XOR-updated as it changes, so this is cheap enough to use as the key for looking up
+        states in a search tree or transposition table.
+        """
+        state_hash = self.board.state_hash ^ self._turn_hash
+        for player in self.players:
+            state_hash ^= player.resource_hash
+        if self.longest_road_owner is not None:
+            state_hash ^= zobrist_key(
+                ZobristFeature.LONGEST_ROAD, self.longest_road_owner.id
+            )
+        return state_hash
+
+    def snapshot(self) -> tuple:
+        """Get a snapshot of the game's state, which can be passed to restore to undo any changes made since.
+
+        Much faster than copying the game or serializing it, since only the board's arrays and caches, the
+        players' hands and the undo journal are copied. The journal is copied rather than just its length, so that
+        snapshots can be restored in any order and undo still works afterwards.
+
+        Returns:
+            The snapshot
+        """
+        return (
+            self.board.snapshot(),
+            [
+                (
+                    dict(p.resources),
+                    p.resource_hash,
+                    dict(p.development_cards),
+                    set(p.connected_harbors),
+                    p.number_played_knights,
+                )
+                for p in self.players
+            ],
+            self.longest_road_owner,
+            self.largest_army_owner,
+            list(self.development_card_deck),
+            self.turn,
+            self.phase,
+            tuple(self._journal),
+        )
+
+    def restore(self, snapshot: tuple):
+        """Restore the game to a snapshot.
+
+        Args:
+            snapshot: A snapshot returned by Game.snapshot
+        """
+        (
+            board,
+            players,
+            self.longest_road_owner,
+            self.largest_army_owner,
+            deck,
+            self.turn,
+            self.phase,
+            journal,
+        ) = snapshot
+        self.board.restore(board)
+        for player, (resources, resource_hash, cards, harbors, knights) in zip(
+            self.players, players
+        ):
+            player.resources.update(resources)
+            player.resource_hash = resource_hash
+            player.development_cards.update(cards)
+            player.connected_harbors = set(harbors)
+            player.number_played_knights = knights
+        self.development_card_deck = list(deck)
+        self._journal[:] = journal
+
+    def undo(self):
+        """Undo the last change made to the game.
+
+        Raises:
+            ValueError: If there is nothing to undo
+        """
+        if not self._journal:
+            raise ValueError("There are no changes to undo")
+        entry_type, *entry = self._journal.pop()
+        if entry_type is _JournalEntryType.SETTLEMENT:
+            player, coords, cost_resources = entry
+            self.board.remove_intersection_building(coords)
+            if cost_resources:
+                player.add_resources(BuildingType.SETTLEMENT.get_required_resources())
+        elif entry_type is _JournalEntryType.CITY:
+            player, coords, cost_resources = entry
+            self.board.remove_intersection_building(coords)
+            self.board.add_intersection_building(
+                player, coords, BuildingType.SETTLEMENT, ensure_connected=False
+            )
+            if cost_resources:
+                player.add_resources(BuildingType.CITY.get_required_resources())
+        elif entry_type is _JournalEntryType.ROAD:
+            player, path_id, cost_resources, longest_road_owner = entry
+            self.board.remove_path_building(path_id)
+            if cost_resources:
+                player.add_resources(BuildingType.ROAD.get_required_resources())
+            self.longest_road_owner = longest_road_owner
+        elif entry_type is _JournalEntryType.YIELD:
+            (resources,) = entry
+            for player, amounts in resources.items():
+                player.remove_resources(amounts)
+        elif entry_type is _JournalEntryType.ROBBER:
+            (self.board.robber_index,) = entry
+        elif entry_type is _JournalEntryType.DEVELOPMENT_CARD:
+            player, card = entry
+            player.development_cards[card] -= 1
+            self.development_card_deck.insert(0, card)
+            player.add_resources(DevelopmentCard.get_required_resources())
+        elif entry_type is _JournalEntryType.TRADE:
+            player, trade = entry
+            player.add_resources({r: -n for r, n in trade.items()})
 
     def build_settlement(
         self,
@@ -75,11 +247,14 @@ class Game:
         # Remove the resources
         if cost_resources:
             player.remove_resources(BuildingType.SETTLEMENT.get_required_resources())
+        self._journal.append(
+            (_JournalEntryType.SETTLEMENT, player, coords, cost_resources)
+        )
 
     def build_road(
         self,
         player: Player,
-        path_coords: Set[Coords],
+        path_coords: Union[Set[Coords], int],
         cost_resources: Optional[bool] = True,
         ensure_connected: Optional[bool] = True,
     ):
@@ -88,7 +263,7 @@ class Game:
         Args:
             player: The player who is building the road
             path_coords: The coordinates of the path to build a road on.
-                Should be two valid connected intersection coordinates (i.e. {(1, 0), (1, -1)})
+                Should be two valid connected intersection coordinates (i.e. {(1, 0), (1, -1)}), or the id of the path
             cost_resources: Whether to remove resources from the player's hand to build the road,
                 and raise an error if they don't have enough
             ensure_connected: Whether to ensure that the road is connected to another road, settlement or city
@@ -115,6 +290,19 @@ class Game:
         # Remove the resources
         if cost_resources:
             player.remove_resources(BuildingType.ROAD.get_required_resources())
+        self._journal.append(
+            (
+                _JournalEntryType.ROAD,
+                player,
+                (
+                    int(path_coords)
+                    if isinstance(path_coords, Integral)
+                    else self.board.get_path_id(path_coords)
+                ),
+                cost_resources,
+                self.longest_road_owner,
+            )
+        )
 
         # Check if the player gets longest road
         road_length = self.board.calculate_player_longest_road(player)
@@ -152,14 +340,24 @@ class Game:
 
         if cost_resources:
             player.remove_resources(BuildingType.CITY.get_required_resources())
+        self._journal.append((_JournalEntryType.CITY, player, coords, cost_resources))
 
     def add_yield_for_roll(self, roll: int):
         """Add the resources to the player's hands for the dice roll given.
 
+        Uses Board.get_resource_deltas_for_roll, so the resources' sources are not worked out.
+        Use add_yield with Board.get_yield_for_roll for those.
+
         Args:
             roll: The number that was rolled
         """
-        self.add_yield(self.board.get_yield_for_roll(roll))
+        deltas = self.board.get_resource_deltas_for_roll(roll)
+        resources = {}
+        for player, delta in zip(self.board.players, deltas.tolist()):
+            if any(delta):
+                resources[player] = {r: delta[r.value] for r in Resource}
+                player.add_resources(resources[player])
+        self._journal.append((_JournalEntryType.YIELD, resources))
 
     def add_yield(self, roll_yield: Dict[Player, RollYield]):
         """Add the yield provided to the player's hands.
@@ -170,6 +368,12 @@ class Game:
         """
         for p, y in roll_yield.items():
             p.add_resources(y.total_yield)
+        self._journal.append(
+            (
+                _JournalEntryType.YIELD,
+                {p: dict(y.total_yield) for p, y in roll_yield.items()},
+            )
+        )
 
     def move_robber(self, coords: Coords):
         """Move the robber to the coords specified.
@@ -182,6 +386,7 @@ class Game:
         if not self.board.is_valid_hex_coords(coords):
             raise ValueError("coords is no a valid hex coordinate")
 
+        self._journal.append((_JournalEntryType.ROBBER, self.board.robber_index))
         self.board.robber = coords
 
     def build_development_card(self, player: Player) -> DevelopmentCard:
@@ -202,8 +407,26 @@ class Game:
         card = self.development_card_deck.pop(0)
         player.development_cards[card] += 1
         player.remove_resources(DevelopmentCard.get_required_resources())
+        self._journal.append((_JournalEntryType.DEVELOPMENT_CARD, player, card))
         return card
 
+    def trade(self, player: Player, trade: Dict[Resource, int]):
+        """Make a trade with the bank or a harbor.
+
+        Does not check that the player is allowed to make the trade, i.e. that the trade is one of the
+        trades returned by Player.get_possible_trades.
+
+        Args:
+            player: The player making the trade
+            trade: The trade, with negative numbers for the resources the player gives away and positive
+                numbers for the resources the player receives
+        Raises:
+            NotEnoughResourcesError: If the player does not have the resources they are giving away
+        """
+        player.remove_resources({r: -n for r, n in trade.items() if n < 0})
+        player.add_resources({r: n for r, n in trade.items() if n > 0})
+        self._journal.append((_JournalEntryType.TRADE, player, dict(trade)))
+
     def play_development_card(self, player: Player, card: DevelopmentCard):
         """Play a development card.
 
@@ -234,17 +457,11 @@ class Game:
         Returns:
             The number of victory points
         """
-        victory_points = sum(
-            list(
-                map(
-                    lambda c: 2 if c.building.building_type is BuildingType.CITY else 1,
-                    [
-                        c
-                        for c in self.board.intersections.values()
-                        if c.building is not None and c.building.owner is player
-                    ],
-                )
-            )
+        # Settlements and cities are stored as 1 and 2, the same as the points they are worth
+        victory_points = int(
+            self.board.intersection_types[
+                self.board.intersection_owners == self.board.get_player_slot(player)
+            ].sum()
         )
         if player is self.longest_road_owner:
             victory_points += 2
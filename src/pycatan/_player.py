@@ -4,6 +4,7 @@ import random
 from ._resource import Resource
 from .errors import NotEnoughResourcesError
 from ._development_card import DevelopmentCard
+from ._zobrist import ZobristFeature, zobrist_key
 
 
 class Player:
@@ -13,6 +14,8 @@ class Player:
             resources (Dict[Resource, int]): How many of each resource this player has
             development_cards (Dict[DevelopmentCard, int]): How many of each development card this player has
             connected_harbors (Set[Harbor]): The harbors this player is connected to. Used to determine the valid trades
+            resource_hash (int): A 64 bit Zobrist hash of the player's resources. Kept up to date by the methods
+                below, so resources should be changed through them rather than by writing to the dict
     """
 
     def __init__(self, id):
@@ -21,6 +24,7 @@ class Player:
         self.connected_harbors = set()
         self.number_played_knights = 0
         self.id = id
+        self.resource_hash = 0
 
     def has_resources(self, resources: Dict[Resource, int]) -> bool:
         """Check if the player has the resources given.
@@ -51,7 +55,7 @@ class Player:
             )
 
         for res, num in resources.items():
-            self.resources[res] -= num
+            self._set_resource(res, self.resources[res] - num)
 
     def add_resources(self, resources: Dict[Resource, int]):
         """Add some resources to this player's hand.
@@ -60,7 +64,30 @@ class Player:
             resources: The resources to add
         """
         for res, num in resources.items():
-            self.resources[res] += num
+            self._set_resource(res, self.resources[res] + num)
+
+    def set_resources(self, resources: Dict[Resource, int]):
+        """Set how many of some resources are in this player's hand.
+
+        Args:
+            resources: The new amount of each resource
+        """
+        for res, num in resources.items():
+            self._set_resource(res, num)
+
+    def _set_resource(self, res: Resource, num: int):
+        previous = self.resources[res]
+        if num != previous:
+            self.resource_hash ^= self._get_resource_key(
+                res, previous
+            ) ^ self._get_resource_key(res, num)
+            self.resources[res] = num
+
+    def _get_resource_key(self, res: Resource, num: int) -> int:
+        # Having none of a resource doesn't change the hash, so a player with no resources hashes to 0
+        if num == 0:
+            return 0
+        return zobrist_key(ZobristFeature.RESOURCE, self.id, res.value, int(num))
 
     def get_possible_trades(self) -> List[Dict[Resource, int]]:
         """Get a list of the possible trades for this player.
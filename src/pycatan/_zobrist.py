@@ -0,0 +1,51 @@
+from enum import Enum
+from functools import lru_cache
+
+MASK = (1 << 64) - 1
+
+
+class ZobristFeature(Enum):
+    """The parts of the game state that are given Zobrist keys."""
+
+    INTERSECTION = 0
+    """A building on an intersection, keyed by the intersection, owner and building type"""
+    PATH = 1
+    """A road on a path, keyed by the path and owner"""
+    ROBBER = 2
+    """The robber, keyed by the hex it is on"""
+    RESOURCE = 3
+    """A player's resources, keyed by the player, resource and amount"""
+    TURN = 4
+    """Whose turn it is"""
+    PHASE = 5
+    """The phase of the game"""
+    LONGEST_ROAD = 6
+    """Who has the longest road"""
+
+
+def _mix(value: int) -> int:
+    # The splitmix64 finalizer, which spreads every input bit over all 64 output bits
+    value = (value + 0x9E3779B97F4A7C15) & MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK
+    return value ^ (value >> 31)
+
+
+@lru_cache(maxsize=None)
+def zobrist_key(feature: ZobristFeature, *values: int) -> int:
+    """Get the 64 bit key for part of the game state.
+
+    The state hash is the XOR of the keys of every part of the state, so it can be updated by XORing out
+    the old key and XORing in the new key whenever something changes. Keys are derived from the values
+    rather than drawn at random, so hashes are the same in every process.
+
+    Args:
+        feature: The part of the state
+        values: The integers which identify the value of that part, e.g. the intersection, owner and building type
+    Returns:
+        The key
+    """
+    key = _mix(feature.value)
+    for value in values:
+        key = _mix(key ^ (value & MASK))
+    return key
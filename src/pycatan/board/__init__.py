@@ -10,8 +10,10 @@ from ._harbor import Harbor
 from ._hex import Hex
 from ._hex_type import HexType
 from ._intersection import Intersection
+from ._invalid_reason import InvalidReason
 from ._path import Path
 from ._random_board import RandomBoard
+from ._topology import BoardTopology
 
 __all__ = [
     "Board",
@@ -26,6 +28,8 @@ __all__ = [
     "Hex",
     "HexType",
     "Intersection",
+    "InvalidReason",
     "Path",
     "RandomBoard",
+    "BoardTopology",
 ]
@@ -1,5 +1,8 @@
-from typing import Dict, Set, Optional, FrozenSet
+from typing import Dict, List, Set, Optional, FrozenSet, Union
 from itertools import product
+from numbers import Integral
+
+import numpy as np
 
 from ._coords import Coords
 from ._hex import Hex
@@ -9,16 +12,14 @@ from ._path import Path
 from .._player import Player
 from ._building import IntersectionBuilding, PathBuilding
 from ._harbor import Harbor
+from ._topology import BoardTopology, indices_in_mask
+from ._road_network import RoadNetwork
+from ._invalid_reason import InvalidReason
 from ._building_type import BuildingType
 from .._resource import Resource
-from ..errors import (
-    InvalidCoordsError,
-    TooCloseToBuildingError,
-    CoordsBlockedError,
-    RequiresSettlementError,
-    NotConnectedError,
-)
+from ..errors import InvalidCoordsError
 from .._roll_yield import RollYield, RollYieldSource
+from .._zobrist import ZobristFeature, zobrist_key
 
 
 class Board:
@@ -47,7 +48,26 @@ class Board:
                         The paths on the board, keyed by the coordinates of the two intersections they connect
                     harbors (Dict[frozenset[Coords], Harbor]):
                         The harbors on the board, keyed by the coords of the path they are attached to
-                    robber (Set[Coords]): The location of the robber
+                    robber (Coords): The location of the robber
+                    topology (BoardTopology):
+                        The integer-indexed adjacency tables for the hexes, intersections and paths on the board
+                    players (List[Player]):
+                        The players who own buildings on the board, in the order they were given their slot. The
+                        arrays below store players by their index in this list
+                    intersection_owners (numpy.ndarray):
+                        The slot of the player who owns the building on each intersection, or -1 if it is empty,
+                        indexed by the intersection's index in the topology
+                    intersection_types (numpy.ndarray):
+                        The ``BuildingType`` value of the building on each intersection, or 0 if it is empty
+                    path_owners (numpy.ndarray):
+                        The slot of the player who owns the road on each path (i.e. by path id), or -1 if it is empty
+                    robber_index (int): The index of the hex the robber is on
+                    state_hash (int):
+                        A 64 bit Zobrist hash of the buildings on the board and the position of the robber, which is
+                        updated as they change
+
+    The arrays are the board's state, and the buildings on the intersections and paths are views of them.
+    They are read only, since the board keeps other caches which are updated as buildings are added and removed.
     """
 
     def __init__(
@@ -55,13 +75,6 @@ class Board:
     ):
         self.hexes: Dict[Coords, Hex] = dict(zip((h.coords for h in hexes), hexes))
         self.harbors = {frozenset(h.path_coords): h for h in harbors}
-        # Position the robber on the desert
-        if robber:
-            self.robber = robber
-        else:
-            self.robber = [
-                h.coords for h in self.hexes.values() if h.hex_type == HexType.DESERT
-            ][0]
         # Gather the points around each hex into a set
         intersection_coords = set(
             map(
@@ -80,12 +93,391 @@ class Board:
                 coord = c + offset
                 if coord in self.intersections:
                     self.paths[frozenset([c, c + offset])] = Path(set([c, c + offset]))
+        # Index everything so that adjacency queries don't need to do any coordinate arithmetic
+        self.topology = BoardTopology(
+            self.hexes.keys(), self.intersections.keys(), self.paths.keys()
+        )
+        self._hex_list = [self.hexes[c] for c in self.topology.hex_coords]
+        self._intersection_list = [
+            self.intersections[c] for c in self.topology.intersection_coords
+        ]
+        self._path_list = [self.paths[c] for c in self.topology.path_coords]
+        self.players: List[Player] = []
+        self._player_slots: Dict[Player, int] = {}
+        # The board's state, stored as arrays so that it is cheap to copy, hash and compare, and given out as
+        # read only views
+        self._intersection_owners = np.full(len(self._intersection_list), -1, np.int8)
+        self._intersection_types = np.zeros(len(self._intersection_list), np.int8)
+        self._path_owners = np.full(len(self._path_list), -1, np.int8)
+        self.intersection_owners = self._intersection_owners.view()
+        self.intersection_owners.flags.writeable = False
+        self.intersection_types = self._intersection_types.view()
+        self.intersection_types.flags.writeable = False
+        self.path_owners = self._path_owners.view()
+        self.path_owners.flags.writeable = False
+        # The building objects last returned for each intersection/path, so that the same object is
+        # returned until the building changes
+        self._intersection_buildings: List[Optional[IntersectionBuilding]] = [
+            None
+        ] * len(self._intersection_list)
+        self._path_buildings: List[Optional[PathBuilding]] = [None] * len(
+            self._path_list
+        )
+        for i, intersection in enumerate(self._intersection_list):
+            intersection._attach(self, i)
+        for p, path in enumerate(self._path_list):
+            path._attach(self, p)
+        self._intersection_paths: Dict[Coords, FrozenSet[Path]] = {
+            c: frozenset(
+                self._path_list[p] for p in self.topology.intersection_paths[i]
+            )
+            for i, c in enumerate(self.topology.intersection_coords)
+        }
+        self._intersection_harbors = [
+            tuple(h for h in self.harbors.values() if c in h.path_coords)
+            for c in self.topology.intersection_coords
+        ]
+        self._road_network = RoadNetwork(self.topology)
+        # Bitmasks of intersections, used to find where settlements can go without checking every intersection.
+        # The blocked intersections are the ones that have, or are next to, a building
+        self._blocked_intersections = 0
+        self._road_intersections: Dict[Player, int] = {}
+        # Bitmasks of paths, used to find where roads can go without checking every path.
+        # A player's road frontier is the empty paths they could connect a road to
+        self._occupied_paths = 0
+        self._road_frontiers: Dict[Player, int] = {}
+        # The resources each intersection gets from each hex, as a (hex, intersection, resource) array,
+        # and from each roll (ignoring the robber), as a (roll, intersection, resource) array
+        incidence = np.zeros(
+            (len(self._hex_list), len(self._intersection_list)), np.int64
+        )
+        hex_resources = np.zeros((len(self._hex_list), len(Resource)), np.int64)
+        for h, hex in enumerate(self._hex_list):
+            incidence[h, list(self.topology.hex_intersections[h])] = 1
+            resource = hex.hex_type.get_resource()
+            if resource is not None:
+                hex_resources[h, resource.value] = 1
+        self._hex_tokens = np.array([h.token_number or 0 for h in self._hex_list])
+        self._hex_production = incidence[:, :, None] * hex_resources[:, None, :]
+        self._token_production = np.stack(
+            [
+                self._hex_production[self._hex_tokens == roll].sum(axis=0)
+                for roll in range(13)
+            ]
+        )
+        self._token_hexes = [
+            tuple(np.flatnonzero(self._hex_tokens == roll).tolist())
+            for roll in range(13)
+        ]
+        # A (player, intersection) array of how many resources each player's buildings get from a hex, which is
+        # only recalculated after an intersection building changes
+        self._building_weights: Optional[np.ndarray] = None
+        # The expected resources per roll from each hex, using the probability of rolling its token
+        probabilities = np.array(
+            [(6 - abs(7 - t)) / 36 if 2 <= t <= 12 else 0 for t in self._hex_tokens]
+        )
+        self._hex_expected_production = (
+            self._hex_production * probabilities[:, None, None]
+        )
+        self._total_expected_production = self._hex_expected_production.sum(axis=0)
+        # The production for each roll and the expected production with the robber taken into account.
+        # These are updated whenever the robber moves, and are given out as read only views
+        self._roll_production = self._token_production.copy()
+        self._roll_production_view = self._roll_production.view()
+        self._roll_production_view.flags.writeable = False
+        self._expected_production = self._total_expected_production.copy()
+        self._expected_production_view = self._expected_production.view()
+        self._expected_production_view.flags.writeable = False
+        # The coordinates used to look up the Zobrist key of each intersection and path. Coordinates are used
+        # rather than indices since the indices aren't the same on every board
+        self._intersection_key_coords = [
+            (c.q, c.r) for c in self.topology.intersection_coords
+        ]
+        self._path_key_coords = [
+            tuple(v for c in sorted(p, key=lambda c: (c.q, c.r)) for v in (c.q, c.r))
+            for p in self.topology.path_coords
+        ]
+        self.state_hash = 0
+        # Position the robber on the desert
+        self._robber_index: Optional[int] = None
+        if robber:
+            self.robber = robber
+        else:
+            self.robber = [
+                h.coords for h in self.hexes.values() if h.hex_type == HexType.DESERT
+            ][0]
+
+    @property
+    def robber(self) -> Coords:
+        """The coordinates of the hex the robber is on."""
+        return self.topology.hex_coords[self.robber_index]
+
+    @robber.setter
+    def robber(self, coords: Coords):
+        index = self.topology.hex_indices.get(coords)
+        if index is None:
+            raise InvalidCoordsError("The robber must be placed on a hex")
+        self.robber_index = index
+
+    @property
+    def robber_index(self) -> int:
+        """The index of the hex the robber is on."""
+        return self._robber_index
+
+    @robber_index.setter
+    def robber_index(self, index: int):
+        previous = self._robber_index
+        if index == previous:
+            return
+        self._robber_index = index
+        if previous is not None:
+            self.state_hash ^= self._get_robber_key(previous)
+        self.state_hash ^= self._get_robber_key(index)
+        # Only the production from the hex the robber leaves and the hex it lands on changes
+        if previous is not None:
+            self._roll_production[self._hex_tokens[previous]] += self._hex_production[
+                previous
+            ]
+        self._roll_production[self._hex_tokens[index]] -= self._hex_production[index]
+        for h in (previous, index):
+            if h is not None:
+                # Recalculate these rows from the totals, so that rounding errors don't build up
+                rows = list(self.topology.hex_intersections[h])
+                self._expected_production[rows] = (
+                    self._total_expected_production[rows]
+                    - self._hex_expected_production[index][rows]
+                )
+
+    def register_players(self, players: List[Player]):
+        """Give each of the players a slot in the board's arrays, in the order given.
+
+        Players are given a slot automatically the first time they build on the board, so this is only needed
+        to make the slots follow the turn order.
+
+        Args:
+            players: The players
+        """
+        for player in players:
+            self.get_player_slot(player)
+
+    def get_player_slot(self, player: Player) -> int:
+        """Get the number used to store the player in the board's arrays, giving them one if they don't have one yet.
+
+        Args:
+            player: The player
+        Returns:
+            The player's index in ``Board.players``
+        """
+        slot = self._player_slots.get(player)
+        if slot is None:
+            slot = len(self.players)
+            self.players.append(player)
+            self._player_slots[player] = slot
+            self._building_weights = None
+        return slot
+
+    def snapshot(self) -> tuple:
+        """Get a snapshot of the board's state, which can be passed to restore to undo any changes made since.
+
+        Only the arrays and the caches that change as buildings are added are copied, so this is much faster than
+        copying the board.
+
+        Returns:
+            The snapshot
+        """
+        return (
+            self.intersection_owners.copy(),
+            self.intersection_types.copy(),
+            self.path_owners.copy(),
+            self.robber_index,
+            len(self.players),
+            self._blocked_intersections,
+            dict(self._road_intersections),
+            self._occupied_paths,
+            dict(self._road_frontiers),
+            self._building_weights,
+            self._road_network.snapshot(),
+            self.state_hash,
+        )
+
+    def restore(self, snapshot: tuple):
+        """Restore the board to a snapshot.
+
+        The arrays are copied into rather than replaced, so any references to them stay valid.
+
+        Args:
+            snapshot: A snapshot returned by Board.snapshot
+        """
+        (
+            intersection_owners,
+            intersection_types,
+            path_owners,
+            self.robber_index,
+            num_players,
+            self._blocked_intersections,
+            road_intersections,
+            self._occupied_paths,
+            road_frontiers,
+            self._building_weights,
+            road_network,
+            self.state_hash,
+        ) = snapshot
+        np.copyto(self._intersection_owners, intersection_owners)
+        np.copyto(self._intersection_types, intersection_types)
+        np.copyto(self._path_owners, path_owners)
+        for player in self.players[num_players:]:
+            del self._player_slots[player]
+        del self.players[num_players:]
+        self._road_intersections = dict(road_intersections)
+        self._road_frontiers = dict(road_frontiers)
+        self._road_network.restore(road_network)
+
+    def _get_intersection_building(self, index: int) -> Optional[IntersectionBuilding]:
+        # Read the building on an intersection from the arrays, only creating a new object if it has changed
+        owner = self.intersection_owners[index]
+        if owner < 0:
+            return None
+        building_type = self.intersection_types[index]
+        building = self._intersection_buildings[index]
+        if (
+            building is None
+            or building.owner is not self.players[owner]
+            or building.building_type.value != building_type
+        ):
+            building = IntersectionBuilding(
+                self.players[owner],
+                BuildingType(int(building_type)),
+                self.topology.intersection_coords[index],
+            )
+            self._intersection_buildings[index] = building
+        return building
+
+    def _get_path_building(self, index: int) -> Optional[PathBuilding]:
+        # Read the building on a path from the arrays, only creating a new object if it has changed
+        owner = self.path_owners[index]
+        if owner < 0:
+            return None
+        building = self._path_buildings[index]
+        if building is None or building.owner is not self.players[owner]:
+            building = PathBuilding(
+                self.players[owner],
+                BuildingType.ROAD,
+                set(self.topology.path_coords[index]),
+            )
+            self._path_buildings[index] = building
+        return building
+
+    def _get_robber_key(self, index: int) -> int:
+        coords = self.topology.hex_coords[index]
+        return zobrist_key(ZobristFeature.ROBBER, coords.q, coords.r)
+
+    def _get_intersection_key(self, index: int, slot: int, building_type: int) -> int:
+        return zobrist_key(
+            ZobristFeature.INTERSECTION,
+            *self._intersection_key_coords[index],
+            slot,
+            building_type,
+        )
+
+    def _get_path_key(self, index: int, slot: int) -> int:
+        return zobrist_key(ZobristFeature.PATH, *self._path_key_coords[index], slot)
+
+    def _write_intersection(self, index: int, building: Optional[IntersectionBuilding]):
+        # Store the building on an intersection in the arrays, XORing the old building out of the hash and the
+        # new one in
+        previous = int(self.intersection_owners[index])
+        if previous >= 0:
+            self.state_hash ^= self._get_intersection_key(
+                index, previous, int(self.intersection_types[index])
+            )
+        if building is None:
+            self._intersection_owners[index] = -1
+            self._intersection_types[index] = 0
+        else:
+            slot = self.get_player_slot(building.owner)
+            self._intersection_owners[index] = slot
+            self._intersection_types[index] = building.building_type.value
+            self.state_hash ^= self._get_intersection_key(
+                index, slot, building.building_type.value
+            )
+        self._intersection_buildings[index] = building
+        self._building_weights = None
+
+    def _write_path(self, index: int, building: Optional[PathBuilding]):
+        # Store the building on a path in the arrays, updating the hash the same way
+        previous = int(self.path_owners[index])
+        if previous >= 0:
+            self.state_hash ^= self._get_path_key(index, previous)
+        if building is None:
+            self._path_owners[index] = -1
+        else:
+            slot = self.get_player_slot(building.owner)
+            self._path_owners[index] = slot
+            self.state_hash ^= self._get_path_key(index, slot)
+        self._path_buildings[index] = building
+
+    def _set_intersection_building(
+        self, index: int, building: Optional[IntersectionBuilding]
+    ):
+        # Used when Intersection.building is assigned to directly, which skips all the checks
+        self._write_intersection(index, building)
+        self._road_network.set_owner(
+            index, None if building is None else building.owner
+        )
+        self._rebuild_masks()
+
+    def _set_path_building(self, index: int, building: Optional[PathBuilding]):
+        # Used when Path.building is assigned to directly, which skips all the checks
+        previous = self._get_path_building(index)
+        self._write_path(index, building)
+        if previous is not None and previous.building_type is BuildingType.ROAD:
+            self._road_network.remove_road(previous.owner, index)
+        if building is not None and building.building_type is BuildingType.ROAD:
+            self._road_network.add_road(building.owner, index)
+        self._rebuild_masks()
+
+    def get_path_id(self, path_coords: Set[Coords]) -> int:
+        """Get the integer id of a path.
+
+        Ids are given out when the board is created, and can be passed instead of the path's coordinates to any of
+        the methods that take path coordinates.
+
+        Args:
+            path_coords: The coordinates of the two intersections the path connects
+        Returns:
+            The id of the path
+        Raises:
+            ValueError: If the path_coords are not valid
+        """
+        path_index = self._get_path_index(path_coords)
+        if path_index is None:
+            raise ValueError("Invalid path: Path does not exist")
+        return path_index
+
+    def get_path_coords(self, path_id: int) -> FrozenSet[Coords]:
+        """Get the coordinates of the path with the id given.
+
+        Args:
+            path_id: The id of the path
+        Returns:
+            The coordinates of the two intersections the path connects
+        """
+        return self.topology.path_coords[path_id]
+
+    def _get_path_index(self, path_coords: Union[Set[Coords], int]) -> Optional[int]:
+        # Get the index of a path from either its coordinates or its id, or None if there is no such path
+        # Integral rather than int, so that the NumPy integers returned by the array APIs can be used as ids
+        if isinstance(path_coords, Integral):
+            return int(path_coords) if 0 <= path_coords < len(self._path_list) else None
+        if len(path_coords) != 2:
+            return None
+        return self.topology.path_pair_indices.get(tuple(path_coords))
 
     def add_path_building(
         self,
         player: Player,
         building_type: BuildingType,
-        path_coords: Set[Coords],
+        path_coords: Union[Set[Coords], int],
         ensure_connected: Optional[bool] = True,
     ):
         """Add an path building to the board.
@@ -95,78 +487,121 @@ class Board:
         Args:
             player: The player adding the building
             building_type: The building_type of the building being added
-            path_coords: The coordinates the path to build the building on (i.e. the coordinates of the two intersections the path connects)
+            path_coords: The coordinates the path to build the building on (i.e. the coordinates of the two intersections the path connects),
+                or the id of the path
             ensure_connected: Whetehr to ensure that the path building is connected to another building. Defaults to True
         Raises:
             ValueError: If the path_coords are not valid
             CoordsBlockedError: If there is already a building on the path
             NotConnectedError: If check_connection is true and the building is not connected to anything
         """
-        for c in path_coords:
-            if c not in self.intersections.keys():
-                raise ValueError(
-                    "Invalid path: Paths must connect two intersections on the board. %s is not a intersection"
-                    % c
-                )
-
-        if frozenset(path_coords) not in self.paths.keys():
+        path_index = self._get_path_index(path_coords)
+        if path_index is None:
+            if not isinstance(path_coords, Integral):
+                for c in path_coords:
+                    if c not in self.intersections.keys():
+                        raise ValueError(
+                            "Invalid path: Paths must connect two intersections on the board. %s is not a intersection"
+                            % c
+                        )
             raise ValueError("Invalid path: Path does not exist")
 
         if building_type is BuildingType.ROAD:
-            self.assert_valid_road_coords(player, path_coords, ensure_connected)
+            self.assert_valid_road_coords(player, path_index, ensure_connected)
 
         # Add the building
-        self.paths[frozenset(path_coords)].building = PathBuilding(
-            player, path_coords=path_coords, building_type=building_type
+        self._write_path(
+            path_index,
+            PathBuilding(
+                player,
+                path_coords=set(self.topology.path_coords[path_index]),
+                building_type=building_type,
+            ),
         )
+        bit = 1 << path_index
+        self._occupied_paths |= bit
+        for p in self._road_frontiers:
+            self._road_frontiers[p] &= ~bit
+        if building_type is BuildingType.ROAD:
+            self._road_network.add_road(player, path_index)
+            a, b = self.topology.path_intersections[path_index]
+            self._road_intersections[player] = (
+                self._road_intersections.get(player, 0) | (1 << a) | (1 << b)
+            )
+            for i in (a, b):
+                owner = self._road_network.owners[i]
+                if owner is None or owner is player:
+                    self._extend_road_frontier(player, i)
+
+    def remove_path_building(self, path_coords: Union[Set[Coords], int]):
+        """Remove the building on a path, if there is one.
+
+        Args:
+            path_coords: The coordinates of the path (i.e. the coordinates of the two intersections the path connects),
+                or the id of the path
+        Raises:
+            ValueError: If the path_coords are not valid
+        """
+        path_index = self._get_path_index(path_coords)
+        if path_index is None:
+            raise ValueError("Invalid path: Path does not exist")
+        building = self._get_path_building(path_index)
+        if building is None:
+            return
+        self._write_path(path_index, None)
+        if building.building_type is BuildingType.ROAD:
+            self._road_network.remove_road(building.owner, path_index)
+        self._rebuild_masks()
+
+    def check_road_coords(
+        self,
+        player: Player,
+        path_coords: Union[Set[Coords], int],
+        ensure_connected: Optional[bool] = True,
+    ) -> Optional[InvalidReason]:
+        """Check whether a given path is a valid place for the player to build a road, without raising an error.
+
+        Args:
+            player: The player
+            path_coords: The coordinates of the two intersections connected by the path, or the id of the path
+            ensure_connected: Whether to check that the path is connected to the player's existing roads or settlements
+        Returns:
+            None if the player can build a road here, otherwise the reason they can't
+        """
+        path_index = self._get_path_index(path_coords)
+        if path_index is None:
+            return InvalidReason.INVALID_PATH
+        if self._occupied_paths >> path_index & 1:
+            return InvalidReason.PATH_BLOCKED
+        # The player's road frontier is every empty path connected to their buildings or roads,
+        # without going through another player's building
+        if (
+            ensure_connected
+            and not self._road_frontiers.get(player, 0) >> path_index & 1
+        ):
+            return InvalidReason.ROAD_NOT_CONNECTED
+        return None
 
     def assert_valid_road_coords(
         self,
         player: Player,
-        path_coords: Set[Coords],
+        path_coords: Union[Set[Coords], int],
         ensure_connected: Optional[bool] = True,
     ):
         """Assert that a given edge is a valid place for the player to build a road.
 
         Args:
             player: The player
-            path_coords: The coordinates of the two intersections connected by the path
+            path_coords: The coordinates of the two intersections connected by the path, or the id of the path
             ensure_connected: Whether to assert that the path is connected to the player's existing roads or settlements
+        Raises:
+            InvalidCoordsError: If path_coords is not a valid path
+            CoordsBlockedError: If there is already a building on the path
+            NotConnectedError: If ensure_connected is True and the road would not be connected
         """
-        path: Path = self.paths[frozenset(path_coords)]
-        if path.building is not None:
-            raise CoordsBlockedError("There is already a building on this path")
-
-        if ensure_connected:
-            # Check if it's connected to a intersection building
-            valid_buildings = set(
-                filter(
-                    lambda b: b is not None and b.owner is player,
-                    map(lambda c: self.intersections[c].building, path_coords),
-                )
-            )
-            if len(valid_buildings) == 0:
-                # Check if it's connected to another path building
-                paths_connected = set()
-                for coords in path_coords:
-                    for c in self.get_intersection_connected_intersections(
-                        self.intersections[coords]
-                    ):
-                        connected_path = self.paths[frozenset({coords, c.coords})]
-                        # Check if there is an path building (i.e. a road) to be connected to here
-                        if (
-                            connected_path.building is not None
-                            and connected_path.building.owner is player
-                        ):
-                            # Checks that we aren't going through an enemy building to be connected
-                            building = self.intersections[coords].building
-                            if building is None or building.owner is player:
-                                paths_connected.add(path)
-
-                if len(paths_connected) == 0:
-                    raise NotConnectedError(
-                        "Road is not connected to any other building"
-                    )
+        reason = self.check_road_coords(player, path_coords, ensure_connected)
+        if reason is not None:
+            raise reason.get_error()
 
     def add_intersection_building(
         self,
@@ -196,14 +631,129 @@ class Board:
                 % building_type
             )
 
-        self.intersections[coords].building = IntersectionBuilding(
-            player, building_type, coords
+        index = self.topology.intersection_indices[coords]
+        self._write_intersection(
+            index, IntersectionBuilding(player, building_type, coords)
         )
+        self._road_network.set_owner(index, player)
+        self._blocked_intersections |= self.topology.intersection_neighbourhoods[index]
+        self._extend_road_frontier(player, index)
+        # Other players can no longer connect roads through this intersection
+        for p in self._road_frontiers:
+            if p is not player:
+                self._trim_road_frontier(p, index)
 
         # Connect the player to a harbor if they can
-        for harbor in self.harbors.values():
-            if coords in harbor.path_coords and harbor not in player.connected_harbors:
-                player.connected_harbors.add(harbor)
+        for harbor in self._intersection_harbors[index]:
+            player.connected_harbors.add(harbor)
+
+    def remove_intersection_building(self, coords: Coords):
+        """Remove the building on an intersection, if there is one.
+
+        Also disconnects the building's owner from any harbor the building was on.
+
+        Args:
+            coords: The coords of the intersection
+        Raises:
+            InvalidCoordsError: If coords is not a valid intersection
+        """
+        index = self.topology.intersection_indices.get(coords)
+        if index is None:
+            raise InvalidCoordsError("coords must be the coordinates of a intersection")
+        slot = self.intersection_owners[index]
+        if slot < 0:
+            return
+        owner = self.players[slot]
+        self._write_intersection(index, None)
+        self._road_network.set_owner(index, None)
+        self._rebuild_masks()
+        for harbor in self._intersection_harbors[index]:
+            owner.connected_harbors.discard(harbor)
+
+    def _extend_road_frontier(self, player: Player, intersection: int):
+        # Add the empty paths on an intersection to the player's road frontier
+        self._road_frontiers[player] = self._road_frontiers.get(player, 0) | (
+            self.topology.intersection_path_masks[intersection] & ~self._occupied_paths
+        )
+
+    def _trim_road_frontier(self, player: Player, intersection: int):
+        # Remove the paths on an intersection from the player's road frontier, unless they are still
+        # connected to the player through their other intersection
+        frontier = self._road_frontiers[player]
+        for path in indices_in_mask(
+            frontier & self.topology.intersection_path_masks[intersection]
+        ):
+            a, b = self.topology.path_intersections[path]
+            if not self._can_extend_road_from(player, b if a == intersection else a):
+                frontier &= ~(1 << path)
+        self._road_frontiers[player] = frontier
+
+    def _can_extend_road_from(self, player: Player, intersection: int) -> bool:
+        # Whether the player could build a road leaving this intersection
+        owner = self._road_network.owners[intersection]
+        if owner is not None:
+            return owner is player
+        return bool(self._road_intersections.get(player, 0) >> intersection & 1)
+
+    def _rebuild_masks(self):
+        # Recalculate the settlement and road masks from scratch, which is only needed when buildings are removed
+        self._blocked_intersections = 0
+        for i in np.flatnonzero(self.intersection_owners >= 0).tolist():
+            self._blocked_intersections |= self.topology.intersection_neighbourhoods[i]
+        self._occupied_paths = 0
+        self._road_intersections = {p: 0 for p in self._road_intersections}
+        for p in np.flatnonzero(self.path_owners >= 0).tolist():
+            self._occupied_paths |= 1 << p
+            owner = self.players[self.path_owners[p]]
+            a, b = self.topology.path_intersections[p]
+            self._road_intersections[owner] = (
+                self._road_intersections.get(owner, 0) | (1 << a) | (1 << b)
+            )
+        # Every player with a road or a building can have a frontier, including players whose buildings were
+        # assigned directly and who have no roads yet
+        players = (
+            set(self._road_intersections.keys())
+            | set(self._road_frontiers.keys())
+            | {
+                self.players[slot]
+                for slot in np.unique(self.intersection_owners[self.intersection_owners >= 0]).tolist()
+            }
+        )
+        self._road_frontiers = {}
+        for player in players:
+            self._road_frontiers[player] = 0
+            for i in range(len(self._intersection_list)):
+                if self._can_extend_road_from(player, i):
+                    self._extend_road_frontier(player, i)
+
+    def check_settlement_coords(
+        self, player: Player, coords: Coords, ensure_connected: Optional[bool]
+    ) -> Optional[InvalidReason]:
+        """Check whether the coordinates given are a valid place to build a settlement, without raising an error.
+
+        Args:
+            player: The player building the settlement
+            coords: The coordinates to check
+            ensure_connected: Whether the check if the settlement will be connected by road
+        Returns:
+            None if the player can build a settlement here, otherwise the reason they can't
+        """
+        # Check that the coords are referencing a intersection
+        index = self.topology.intersection_indices.get(coords)
+        if index is None:
+            return InvalidReason.INVALID_INTERSECTION
+        # Check that the intersection is empty
+        if self.intersection_owners[index] >= 0:
+            return InvalidReason.INTERSECTION_BLOCKED
+        # Check that the surrounding intersections are empty
+        if self._blocked_intersections >> index & 1:
+            return InvalidReason.TOO_CLOSE_TO_BUILDING
+        if (
+            ensure_connected
+            and not self._road_intersections.get(player, 0) >> index & 1
+        ):
+            return InvalidReason.SETTLEMENT_NOT_CONNECTED
+        return None
 
     def assert_valid_settlement_coords(
         self, coords: Coords, player: Player, ensure_connected: Optional[bool]
@@ -217,66 +767,51 @@ class Board:
             player: The player building the settlement
             ensure_connected: Whether the check if the settlement will be connected by road
         Raises:
+            InvalidCoordsError: If coords is not a valid intersection
             TooCloseToBuildingError: If the building is too close to another building
-            PositionAlreadyTakenError: If the position is already taken
+            CoordsBlockedError: If the position is already taken
             NotConnectedError: If `check_connection` is `True` and the settlement is not connected
         """
-        # Check that the coords are referencing a intersection
-        if coords not in self.intersections:
-            raise InvalidCoordsError("coords must be the coordinates of a intersection")
-        # Check that the intersection is empty
-        if self.intersections[coords].building is not None:
-            raise CoordsBlockedError("There is already a building on this intersection")
-        # Check that the surrounding intersections are empty
-        connected_intersections: Set[
-            Intersection
-        ] = self.get_intersection_connected_intersections(self.intersections[coords])
-        if (
-            len(set(filter(lambda c: c.building is not None, connected_intersections)))
-            > 0
-        ):
-            raise TooCloseToBuildingError(
-                "There is a building that is not at least 2 paths away from this position"
-            )
-        if ensure_connected:
-            path_coords = set(
-                map(lambda c: frozenset({coords, c.coords}), connected_intersections)
-            )
-            paths = set(map(lambda e: self.paths[e], path_coords))
-            if (
-                len(
-                    set(
-                        filter(
-                            lambda path: path.building is not None
-                            and path.building.owner is player,
-                            paths,
-                        )
-                    )
-                )
-                == 0
-            ):
-                raise NotConnectedError("The settlement must be connected by road")
+        reason = self.check_settlement_coords(player, coords, ensure_connected)
+        if reason is not None:
+            raise reason.get_error()
 
-    def assert_valid_city_coords(self, player: Player, coords: Coords):
-        """Check whether the coordinates given are a valid place to build a city by the player given.
+    def check_city_coords(
+        self, player: Player, coords: Coords
+    ) -> Optional[InvalidReason]:
+        """Check whether the coordinates given are a valid place to build a city by the player given, without raising an error.
 
         Args:
             player: The player building the city
             coords: Where to build the city
+        Returns:
+            None if the player can build a city here, otherwise the reason they can't
         """
         # Check the coords are a intersection
-        if coords not in self.intersections.keys():
-            raise InvalidCoordsError("coords must be the coordinates of a intersection")
+        index = self.topology.intersection_indices.get(coords)
+        if index is None:
+            return InvalidReason.INVALID_INTERSECTION
         # Check that a settlement owned by player exists here
         if (
-            self.intersections[coords].building is None
-            or self.intersections[coords].building.owner is not player
-            or self.intersections[coords].building.building_type
-            is not BuildingType.SETTLEMENT
+            self.intersection_owners[index] != self._player_slots.get(player, -1)
+            or self.intersection_types[index] != BuildingType.SETTLEMENT.value
         ):
-            raise RequiresSettlementError(
-                "You must update an existing settlement owned by the player into a city"
-            )
+            return InvalidReason.REQUIRES_SETTLEMENT
+        return None
+
+    def assert_valid_city_coords(self, player: Player, coords: Coords):
+        """Check whether the coordinates given are a valid place to build a city by the player given.
+
+        Args:
+            player: The player building the city
+            coords: Where to build the city
+        Raises:
+            InvalidCoordsError: If coords is not a valid intersection
+            RequiresSettlementError: If there is not a settlement owned by the player at coords
+        """
+        reason = self.check_city_coords(player, coords)
+        if reason is not None:
+            raise reason.get_error()
 
     def is_valid_settlement_coords(
         self, player: Player, coords: Coords, ensure_connected: Optional[bool]
@@ -290,13 +825,7 @@ class Board:
         Returns:
             Whether the coordinates are a valid settlement location for the player
         """
-        try:
-            self.assert_valid_settlement_coords(
-                player=player, coords=coords, ensure_connected=ensure_connected
-            )
-        except:  # noqa: E722
-            return False
-        return True
+        return self.check_settlement_coords(player, coords, ensure_connected) is None
 
     def is_valid_city_coords(self, player: Player, coords: Coords) -> bool:
         """Check whether the coordinates given are valid city coordinates.
@@ -307,53 +836,47 @@ class Board:
         Returns:
             Whether the coords are a valid place for the player to build a city
         """
-        try:
-            self.assert_valid_city_coords(player=player, coords=coords)
-        except:  # noqa: E722
-            return False
-        return True
+        return self.check_city_coords(player, coords) is None
 
     def is_valid_road_coords(
         self,
         player: Player,
-        path_coords: Set[Coords],
+        path_coords: Union[Set[Coords], int],
         ensure_connected: Optional[bool] = True,
     ) -> bool:
         """Check whether the path coordinates given are valid road coordinate for the player given.
 
         Args:
             player: The player
-            path_coords: The coordinates of the path
+            path_coords: The coordinates of the path, or the id of the path
             ensure_connected: Whether to ensure that the road is connected to the player's existing roads/buildings. Defaults to True
         Returns:
             Whether the player can build a road on this path
         """
-        try:
-            self.assert_valid_road_coords(
-                player, path_coords, ensure_connected=ensure_connected
-            )
-        except:  # noqa: E722
-            return False
-        return True
+        return self.check_road_coords(player, path_coords, ensure_connected) is None
 
     def get_valid_settlement_coords(
         self, player: Player, ensure_connected: Optional[bool] = True
     ) -> Set[Coords]:
         """Get all the valid settlement coordinates for the player to build a settlement.
 
+        Uses the masks of blocked intersections and intersections on each player's roads, which are updated as
+        buildings are added, rather than checking every intersection.
+
         Args:
             player: The player to check for valid settlement coordinates
             ensure_connected: Whether to ensure the coordinates are connected to the player's roads
         Returns:
             The coordinates of all the valid settlement intersections
         """
-        return set(
-            [
-                i
-                for i in self.intersections.keys()
-                if self.is_valid_settlement_coords(player, i, ensure_connected)
-            ]
+        available = ~self._blocked_intersections & (
+            (1 << len(self._intersection_list)) - 1
         )
+        if ensure_connected:
+            available &= self._road_intersections.get(player, 0)
+        return {
+            self.topology.intersection_coords[i] for i in indices_in_mask(available)
+        }
 
     def get_valid_city_coords(self, player: Player) -> Set[Coords]:
         """Get all the valid city coordinates for the player to build a city.
@@ -363,13 +886,16 @@ class Board:
         Returns
             The coordinates of all the valid city locations
         """
-        return set(
-            [
-                i
-                for i in self.intersections.keys()
-                if self.is_valid_city_coords(player, i)
-            ]
+        slot = self._player_slots.get(player)
+        if slot is None:
+            return set()
+        settlements = (self.intersection_owners == slot) & (
+            self.intersection_types == BuildingType.SETTLEMENT.value
         )
+        return {
+            self.topology.intersection_coords[i]
+            for i in np.flatnonzero(settlements).tolist()
+        }
 
     def get_valid_road_coords(
         self,
@@ -379,6 +905,8 @@ class Board:
     ) -> Set[FrozenSet[Coords]]:
         """Get all the valid coordinates for the player to build a road.
 
+        Uses each player's road frontier, which is updated as buildings are added, rather than checking every path.
+
         Args:
             player: The player building the road
             ensure_connected:
@@ -387,17 +915,39 @@ class Board:
         Returns:
             The coordinates of all the paths where the player can build a road.
         """
-        to_return = set()
-        for path_coords in self.paths.keys():
-            if self.is_valid_road_coords(
-                player=player,
-                ensure_connected=ensure_connected,
-                path_coords=path_coords,
-            ):
-                if not connected_intersection or connected_intersection in path_coords:
-                    to_return.add(path_coords)
+        return {
+            self.topology.path_coords[p]
+            for p in self.get_valid_road_ids(
+                player, ensure_connected, connected_intersection
+            )
+        }
 
-        return to_return
+    def get_valid_road_ids(
+        self,
+        player: Player,
+        ensure_connected: Optional[bool] = True,
+        connected_intersection: Optional[Coords] = None,
+    ) -> Set[int]:
+        """Get the ids of all the paths where the player can build a road.
+
+        Args:
+            player: The player building the road
+            ensure_connected:
+                Whether to only return the paths that are connected to the player's existing roads/settlements. Defaults to True
+            connected_intersection: The coords of an intersection that the potential road must be attached to. Defaults to None
+        Returns:
+            The ids of all the paths where the player can build a road.
+        """
+        if ensure_connected:
+            available = self._road_frontiers.get(player, 0)
+        else:
+            available = ~self._occupied_paths & ((1 << len(self._path_list)) - 1)
+        if connected_intersection is not None:
+            index = self.topology.intersection_indices.get(connected_intersection)
+            if index is None:
+                return set()
+            available &= self.topology.intersection_path_masks[index]
+        return set(indices_in_mask(available))
 
     def get_intersection_connected_intersections(
         self, intersection: Intersection
@@ -410,11 +960,11 @@ class Board:
         Returns:
             The intersections that are connected to the intersection given
         """
-        connected = set()
-        for c in Intersection.CONNECTED_CORNER_OFFSETS:
-            if c + intersection.coords in self.intersections.keys():
-                connected.add(self.intersections[c + intersection.coords])
-        return connected
+        index = self.topology.intersection_indices[intersection.coords]
+        return {
+            self._intersection_list[i]
+            for i in self.topology.intersection_intersections[index]
+        }
 
     def get_connected_hex_intersections(self, hex: Hex) -> Set[Intersection]:
         """Get all of the intersections that are connected to the hex.
@@ -425,12 +975,10 @@ class Board:
         Returns:
             All 6 intersections that are around this hex
         """
-        return set(
-            map(
-                lambda offset: self.intersections[hex.coords + offset],
-                Hex.CONNECTED_CORNER_OFFSETS,
-            )
-        )
+        index = self.topology.hex_indices[hex.coords]
+        return {
+            self._intersection_list[i] for i in self.topology.hex_intersections[index]
+        }
 
     def get_hexes_connected_to_intersection(
         self, intersection_coords: Coords
@@ -442,16 +990,71 @@ class Board:
         Returns:
             The hexes connected to the intersection
         """
-        return set(
-            [
-                intersection_coords + c
-                for c in Hex.CONNECTED_CORNER_OFFSETS
-                if intersection_coords + c in self.hexes
-            ]
-        )
+        index = self.topology.intersection_indices[intersection_coords]
+        return {
+            self.topology.hex_coords[h] for h in self.topology.intersection_hexes[index]
+        }
+
+    def get_production_for_roll(self, roll: int) -> np.ndarray:
+        """Get the resources a settlement on each intersection would get for a roll.
+
+        Args:
+            roll: The number rolled
+        Returns:
+            A read only (intersection, resource) array of the amount of each resource, indexed by the
+            intersection's index in the topology and the resource's value. Cities get twice this amount
+        """
+        if not 0 <= roll < len(self._roll_production):
+            return np.zeros_like(self._roll_production[0])
+        return self._roll_production_view[roll]
+
+    def get_resource_deltas_for_roll(self, roll: int) -> np.ndarray:
+        """Calculate the resources each player gets for a particular roll.
+
+        Much faster than get_yield_for_roll, since it is a single matrix product of the buildings on the
+        board with the production for the roll, but does not say where the resources came from.
+
+        Args:
+            roll: The number rolled
+        Returns:
+            A (player, resource) array of the amount of each resource each player gets, indexed by the
+            player's slot (i.e. their index in ``Board.players``) and the resource's value
+        """
+        return self._get_building_weights() @ self.get_production_for_roll(roll)
+
+    def get_expected_production(self) -> np.ndarray:
+        """Get the resources a settlement on each intersection is expected to get per roll of the dice.
+
+        Uses the probability of rolling each hex's token, and takes the robber into account. The table is
+        updated when the robber moves rather than when it is requested, so this doesn't do any work.
+
+        Returns:
+            A read only (intersection, resource) array, indexed by the intersection's index in the topology and
+            the resource's value. It is a view which is updated in place when the robber moves
+        """
+        return self._expected_production_view
+
+    def get_expected_resource_deltas(self) -> np.ndarray:
+        """Get the resources each player is expected to get per roll of the dice from their buildings.
+
+        Returns:
+            A (player, resource) array, indexed by the player's slot and the resource's value
+        """
+        return self._get_building_weights() @ self.get_expected_production()
+
+    def _get_building_weights(self) -> np.ndarray:
+        # Get the (player, intersection) building weights, recalculating them if a building has changed
+        if self._building_weights is None:
+            # Settlements are stored as 1 and cities as 2, which is how many resources they get from each hex
+            self._building_weights = (
+                self.intersection_owners == np.arange(len(self.players))[:, None]
+            ) * self.intersection_types.astype(np.int64)
+        return self._building_weights
 
     def get_yield_for_roll(self, roll: int) -> Dict[Player, RollYield]:
-        """Calculate the resources given out for a particular roll.
+        """Calculate the resources given out for a particular roll, along with where they came from.
+
+        Use get_resource_deltas_for_roll instead if only the amount of resources is needed.
 
         Args:
             roll: The number rolled
@@ -459,11 +1062,16 @@ class Board:
             The RollYield object containing the information for what each player gets, keyed by the player
         """
         total_yield: Dict[Player, RollYield] = {}
-        for hex in self.hexes.values():
-            if hex.token_number == roll and self.robber != hex.coords:
+        # Skip looking for the sources if no one gets anything
+        if not self.get_resource_deltas_for_roll(roll).any():
+            return total_yield
+        for index in self._token_hexes[roll]:
+            hex = self._hex_list[index]
+            if self.robber_index != index:
                 resource = hex.hex_type.get_resource()
                 # Check around the hex for any settlements/cities
-                for intersection in self.get_connected_hex_intersections(hex):
+                for i in self.topology.hex_intersections[index]:
+                    intersection = self._intersection_list[i]
                     if intersection.building is not None:
                         owner = intersection.building.owner
                         if owner not in total_yield.keys():
@@ -493,55 +1101,31 @@ class Board:
         Returns:
             Whether there is a hex at those coordinates
         """
-        return len(set(filter(lambda x: x == coords, self.hexes.keys()))) != 0
+        return coords in self.hexes
 
     def calculate_player_longest_road(self, player: Player) -> int:
         """Calculate the length of the longest road segment for the player given.
 
+        The result is kept up to date as roads and buildings are added, so this does not search the board.
+
         Args:
             player: The player to calculate the longest road for
         Returns:
             The length of the ongest road segment
         """
-        paths = [
-            e
-            for e in self.paths.values()
-            if e.building is not None and e.building.owner is player
-        ]
-        starting = [(c, [e]) for e in paths for c in e.path_coords]
-        if len(starting) == 0:
-            return 0
-
-        current_longest = starting[0][1]
-
-        potential = starting
-        while len(potential) > 0:
-            current = potential.pop(0)
-            building = self.intersections[current[0]].building
-            if building is not None and building.owner is not player:
-                continue
-            for path in self.get_paths_for_intersection_coords(current[0]):
-                if (
-                    path not in current[1]
-                    and path.building is not None
-                    and path.building.owner is player
-                ):
-                    other_intersection = path.other_intersection(current[0])
-                    potential.append((other_intersection, [path] + current[1]))
-                    if len(current[1]) + 1 > len(current_longest):
-                        current_longest = [path] + current[1]
-
-        return len(current_longest)
+        return self._road_network.get_longest_road(player)
 
     def get_paths_for_intersection_coords(self, coords: Coords) -> Set[Path]:
         """Get all the paths who that connected to the intersection given.
 
+        Uses an index built when the board is created, so does not scan all of the paths.
+
         Args:
             coords: The coordinates of the intersection
         Returns:
-            A set of the paths attached to that intersection
+            A new set of the paths attached to that intersection, which the caller is free to change
         """
-        return set(filter(lambda e: coords in e.path_coords, self.paths.values()))
+        return set(self._intersection_paths[coords])
 
     def get_hex_resources_for_intersection(self, coords: Coords) -> Dict[Resource, int]:
         """Get the associated resources for the hexes around the intersection at the coords given.
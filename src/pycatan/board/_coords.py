@@ -1,3 +1,10 @@
+from typing import Dict, Tuple
+
+# Coordinates with both q and r in this range are interned, which covers every
+# coordinate on a standard board along with the offsets used to move around it
+INTERN_RANGE = 16
+
+
 class Coords:
     """
     A class used to represent coordinates on the Catan board.
@@ -5,19 +12,50 @@ class Coords:
     Stores a coordinate on a triangular grid, so that each
     hex and point both has a unique coord.
 
+    Coords are immutable, and coordinates near the board are interned so that
+    creating the same coordinates twice (including through ``+`` and ``-``) returns
+    the same object. This makes equality checks and hashing very cheap, since the hash
+    is only calculated once and equal coords are usually the same object.
+
     Args:
             q (int): The q coordinate
             r (int): The r coordinate
     """
 
-    def __init__(self, q, r):
-        self.q = q
-        self.r = r
+    __slots__ = ("q", "r", "_hash")
+
+    _interned: Dict[Tuple[int, int], "Coords"] = {}
+
+    def __new__(cls, q, r):
+        """Create the coords, or return the interned instance if these coords have been created before."""
+        key = (q, r)
+        coords = cls._interned.get(key)
+        if coords is None:
+            coords = object.__new__(cls)
+            object.__setattr__(coords, "q", q)
+            object.__setattr__(coords, "r", r)
+            object.__setattr__(coords, "_hash", hash(key))
+            if (
+                -INTERN_RANGE <= q <= INTERN_RANGE
+                and -INTERN_RANGE <= r <= INTERN_RANGE
+            ):
+                cls._interned[key] = coords
+        return coords
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Coords are immutable")
+
+    def __reduce__(self):
+        return (Coords, (self.q, self.r))
 
     def __hash__(self):
-        return hash((self.q, self.r))
+        return self._hash
 
     def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Coords):
+            return NotImplemented
         return self.q == other.q and self.r == other.r
 
     def __add__(self, other):
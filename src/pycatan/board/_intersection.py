@@ -7,6 +7,9 @@ from ._building import IntersectionBuilding
 class Intersection:
     """A intersection on the Catan board.
 
+    Once the intersection has been added to a board, its building is stored in the board's
+    ``intersection_owners`` and ``intersection_types`` arrays, and ``building`` becomes a view of them.
+
     Args:
         coords:
                 The coordinates of the intersection.
@@ -35,4 +38,25 @@ class Intersection:
 
     def __init__(self, coords: Coords, building: Optional[IntersectionBuilding] = None):
         self.coords = coords
-        self.building = building
+        self._board = None
+        self._index = None
+        self._building = building
+
+    @property
+    def building(self) -> Optional[IntersectionBuilding]:
+        """The building on the intersection, or None if it is empty."""
+        if self._board is None:
+            return self._building
+        return self._board._get_intersection_building(self._index)
+
+    @building.setter
+    def building(self, building: Optional[IntersectionBuilding]):
+        if self._board is None:
+            self._building = building
+        else:
+            self._board._set_intersection_building(self._index, building)
+
+    def _attach(self, board, index: int):
+        # Store the building in the board's arrays from now on
+        self._board = board
+        self._index = index
@@ -0,0 +1,80 @@
+from enum import Enum
+
+from ..errors import (
+    InvalidCoordsError,
+    TooCloseToBuildingError,
+    CoordsBlockedError,
+    RequiresSettlementError,
+    NotConnectedError,
+)
+
+
+class InvalidReason(Enum):
+    """The reason a building cannot be built somewhere.
+
+    Returned by the Board's check methods, which are used instead of the assert methods when checking
+    lots of locations, since raising and catching an error for each invalid location is slow.
+    """
+
+    INVALID_INTERSECTION = 0
+    """The coordinates are not an intersection on the board"""
+    INVALID_PATH = 1
+    """The coordinates are not a path on the board"""
+    INTERSECTION_BLOCKED = 2
+    """There is already a building on the intersection"""
+    PATH_BLOCKED = 3
+    """There is already a building on the path"""
+    TOO_CLOSE_TO_BUILDING = 4
+    """There is a building on a connected intersection"""
+    SETTLEMENT_NOT_CONNECTED = 5
+    """The settlement would not be connected to one of the player's roads"""
+    ROAD_NOT_CONNECTED = 6
+    """The road would not be connected to one of the player's roads or buildings"""
+    REQUIRES_SETTLEMENT = 7
+    """There is not a settlement owned by the player to upgrade"""
+
+    def get_error(self) -> InvalidCoordsError:
+        """Get the error to raise for this reason.
+
+        Returns:
+            The error, with a message describing why the location is not valid
+        """
+        error, message = _ERRORS[self]
+        return error(message)
+
+
+# The type of error and the message for each reason, so that only the error being raised is created
+_ERRORS = {
+    InvalidReason.INVALID_INTERSECTION: (
+        InvalidCoordsError,
+        "coords must be the coordinates of a intersection",
+    ),
+    InvalidReason.INVALID_PATH: (
+        InvalidCoordsError,
+        "path_coords must be the coordinates of a path",
+    ),
+    InvalidReason.INTERSECTION_BLOCKED: (
+        CoordsBlockedError,
+        "There is already a building on this intersection",
+    ),
+    InvalidReason.PATH_BLOCKED: (
+        CoordsBlockedError,
+        "There is already a building on this path",
+    ),
+    InvalidReason.TOO_CLOSE_TO_BUILDING: (
+        TooCloseToBuildingError,
+        "There is a building that is not at least 2 paths away from this position",
+    ),
+    InvalidReason.SETTLEMENT_NOT_CONNECTED: (
+        NotConnectedError,
+        "The settlement must be connected by road",
+    ),
+    InvalidReason.ROAD_NOT_CONNECTED: (
+        NotConnectedError,
+        "Road is not connected to any other building",
+    ),
+    InvalidReason.REQUIRES_SETTLEMENT: (
+        RequiresSettlementError,
+        "You must update an existing settlement owned by the player into a city",
+    ),
+}
@@ -6,6 +6,9 @@ from ._building import PathBuilding
 class Path:
     """A path on a Catan board.
 
+    Once the path has been added to a board, its building is stored in the board's ``path_owners``
+    array, and ``building`` becomes a view of it.
+
     Args:
             path_coords: The coordinates of the two intersections
                 that the path connects.
@@ -20,7 +23,28 @@ class Path:
         self, path_coords: Set[Coords], building: Optional[PathBuilding] = None
     ):
         self.path_coords = path_coords
-        self.building = building
+        self._board = None
+        self._index = None
+        self._building = building
+
+    @property
+    def building(self) -> Optional[PathBuilding]:
+        """The building on the path, or None if it is empty."""
+        if self._board is None:
+            return self._building
+        return self._board._get_path_building(self._index)
+
+    @building.setter
+    def building(self, building: Optional[PathBuilding]):
+        if self._board is None:
+            self._building = building
+        else:
+            self._board._set_path_building(self._index, building)
+
+    def _attach(self, board, index: int):
+        # Store the building in the board's arrays from now on
+        self._board = board
+        self._index = index
 
     def other_intersection(self, coords: Coords) -> Coords:
         """Given one of the intersection coords for this path, returns the other one.
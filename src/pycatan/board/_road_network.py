@@ -0,0 +1,145 @@
+from typing import Dict, List, Optional
+
+from .._player import Player
+from ._topology import BoardTopology, indices_in_mask
+
+
+class RoadNetwork:
+    """Keeps track of the length of each player's longest road as roads and buildings are added to a board.
+
+    Each player's roads are split into connected components, each stored as a bitmask of path indices
+    along with a bitmask of the intersections it touches. The longest road in a component is found with
+    a depth first search over the edge bitmask, and is only recomputed when that component changes, i.e.
+    when one of the player's roads is added to it or another player builds on one of its intersections.
+
+    Args:
+        topology: The topology of the board the roads are on
+
+    Attributes:
+        owners (List[Optional[Player]]): The owner of the building on each intersection, by intersection index
+    """
+
+    def __init__(self, topology: BoardTopology):
+        self._topology = topology
+        self.owners: List[Optional[Player]] = [None] * len(topology.intersection_coords)
+        # Each component is a list of [path mask, intersection mask, longest road]
+        self._components: Dict[Player, List[List[int]]] = {}
+        self._longest: Dict[Player, int] = {}
+
+    def add_road(self, player: Player, path: int):
+        """Add a road to the network, merging any of the player's components that it connects.
+
+        Args:
+            player: The player who owns the road
+            path: The index of the path the road is on
+        """
+        a, b = self._topology.path_intersections[path]
+        path_mask = 1 << path
+        intersection_mask = (1 << a) | (1 << b)
+        components = self._components.setdefault(player, [])
+        remaining = []
+        for component in components:
+            if component[1] & intersection_mask:
+                path_mask |= component[0]
+                intersection_mask |= component[1]
+            else:
+                remaining.append(component)
+        merged = [path_mask, intersection_mask, 0]
+        merged[2] = self._calculate_component(player, merged)
+        remaining.append(merged)
+        self._components[player] = remaining
+        self._longest[player] = max(self._longest.get(player, 0), merged[2])
+
+    def remove_road(self, player: Player, path: int):
+        """Remove a road from the network, recalculating all of the player's components.
+
+        Args:
+            player: The player who owns the road
+            path: The index of the path the road is on
+        """
+        paths = 0
+        for component in self._components.get(player, []):
+            paths |= component[0]
+        paths &= ~(1 << path)
+        self._components[player] = []
+        self._longest[player] = 0
+        for p in indices_in_mask(paths):
+            self.add_road(player, p)
+
+    def set_owner(self, intersection: int, player: Optional[Player]):
+        """Set who owns the building on an intersection, recalculating any components it may cut through.
+
+        Args:
+            intersection: The index of the intersection
+            player: The owner of the building, or None if the building was removed
+        """
+        previous = self.owners[intersection]
+        self.owners[intersection] = player
+        if previous is player:
+            return
+        bit = 1 << intersection
+        for p, components in self._components.items():
+            if not any(c[1] & bit for c in components):
+                continue
+            # Replace the components instead of changing them, so that they can be shared with snapshots
+            components = [
+                [c[0], c[1], self._calculate_component(p, c)] if c[1] & bit else c
+                for c in components
+            ]
+            self._components[p] = components
+            self._longest[p] = max([c[2] for c in components], default=0)
+
+    def snapshot(self) -> tuple:
+        """Get a snapshot of the network, which can be passed to restore to undo any changes made since.
+
+        Components are never changed once they are created, so they are shared with the snapshot rather than copied.
+
+        Returns:
+            The snapshot
+        """
+        return (tuple(self.owners), dict(self._components), dict(self._longest))
+
+    def restore(self, snapshot: tuple):
+        """Restore the network to a snapshot.
+
+        Args:
+            snapshot: A snapshot returned by RoadNetwork.snapshot
+        """
+        owners, components, longest = snapshot
+        self.owners[:] = owners
+        self._components = dict(components)
+        self._longest = dict(longest)
+
+    def get_longest_road(self, player: Player) -> int:
+        """Get the length of the player's longest road.
+
+        Args:
+            player: The player
+        Returns:
+            The length of the longest road segment
+        """
+        return self._longest.get(player, 0)
+
+    def _calculate_component(self, player: Player, component: List[int]) -> int:
+        return max(
+            self._search(player, i, component[0]) for i in indices_in_mask(component[1])
+        )
+
+    def _search(self, player: Player, intersection: int, paths: int) -> int:
+        # Depth first search for the longest trail starting at intersection, using only the paths left in the mask
+        longest = 0
+        for path in self._topology.intersection_paths[intersection]:
+            bit = 1 << path
+            if not paths & bit:
+                continue
+            a, b = self._topology.path_intersections[path]
+            other = b if a == intersection else a
+            owner = self.owners[other]
+            # Roads can end at another player's building, but can't continue through it
+            if owner is None or owner is player:
+                length = 1 + self._search(player, other, paths & ~bit)
+            else:
+                length = 1
+            if length > longest:
+                longest = length
+        return longest
@@ -0,0 +1,117 @@
+from typing import Dict, FrozenSet, Iterator, List, Sequence, Tuple
+
+from ._coords import Coords
+from ._hex import Hex
+
+
+class BoardTopology:
+    """The static layout of a Catan board, with every hex, intersection and path given an integer index.
+
+    The layout never changes once a board has been created, so all of the neighbour lookups are computed
+    once here and stored as tuples of indices. The indices follow the order of the sequences passed in,
+    which for a Board is the order of ``Board.hexes``, ``Board.intersections`` and ``Board.paths``.
+
+    Args:
+        hex_coords: The coordinates of every hex
+        intersection_coords: The coordinates of every intersection
+        path_coords: The coordinates of every path, as the coordinates of the two intersections it connects
+
+    Attributes:
+        hex_coords (List[Coords]): The coordinates of each hex, by index
+        hex_indices (Dict[Coords, int]): The index of each hex, keyed by its coordinates
+        intersection_coords (List[Coords]): The coordinates of each intersection, by index
+        intersection_indices (Dict[Coords, int]): The index of each intersection, keyed by its coordinates
+        path_coords (List[FrozenSet[Coords]]): The coordinates of each path, by index
+        path_indices (Dict[FrozenSet[Coords], int]): The index of each path, keyed by its coordinates
+        path_pair_indices (Dict[Tuple[Coords, Coords], int]):
+            The index of each path, keyed by the coordinates of its two intersections in either order.
+            Faster to look up than path_indices since it doesn't need a frozenset to be built
+        intersection_intersections (List[Tuple[int, ...]]): The intersections connected to each intersection by a path
+        intersection_paths (List[Tuple[int, ...]]): The paths attached to each intersection
+        intersection_hexes (List[Tuple[int, ...]]): The hexes touching each intersection
+        hex_intersections (List[Tuple[int, ...]]): The intersections around each hex
+        path_intersections (List[Tuple[int, int]]): The two intersections each path connects
+        intersection_path_masks (List[int]): A bitmask of the paths attached to each intersection
+        intersection_neighbourhoods (List[int]):
+            A bitmask of each intersection along with the intersections connected to it, i.e. the intersections a
+            building on it stops other settlements from being built on
+    """
+
+    def __init__(
+        self,
+        hex_coords: Sequence[Coords],
+        intersection_coords: Sequence[Coords],
+        path_coords: Sequence[FrozenSet[Coords]],
+    ):
+        self.hex_coords: List[Coords] = list(hex_coords)
+        self.hex_indices: Dict[Coords, int] = {
+            c: i for i, c in enumerate(self.hex_coords)
+        }
+        self.intersection_coords: List[Coords] = list(intersection_coords)
+        self.intersection_indices: Dict[Coords, int] = {
+            c: i for i, c in enumerate(self.intersection_coords)
+        }
+        self.path_coords: List[FrozenSet[Coords]] = list(path_coords)
+        self.path_indices: Dict[FrozenSet[Coords], int] = {
+            c: i for i, c in enumerate(self.path_coords)
+        }
+        self.path_pair_indices: Dict[Tuple[Coords, Coords], int] = {}
+        for i, c in enumerate(self.path_coords):
+            a, b = c
+            self.path_pair_indices[(a, b)] = i
+            self.path_pair_indices[(b, a)] = i
+
+        self.path_intersections: List[Tuple[int, int]] = [
+            tuple(sorted(self.intersection_indices[c] for c in p))
+            for p in self.path_coords
+        ]
+
+        intersection_paths = [[] for _ in self.intersection_coords]
+        intersection_intersections = [[] for _ in self.intersection_coords]
+        for path, (a, b) in enumerate(self.path_intersections):
+            intersection_paths[a].append(path)
+            intersection_paths[b].append(path)
+            intersection_intersections[a].append(b)
+            intersection_intersections[b].append(a)
+        self.intersection_paths: List[Tuple[int, ...]] = [
+            tuple(p) for p in intersection_paths
+        ]
+        self.intersection_intersections: List[Tuple[int, ...]] = [
+            tuple(i) for i in intersection_intersections
+        ]
+        self.intersection_path_masks: List[int] = [
+            sum(1 << p for p in paths) for paths in self.intersection_paths
+        ]
+        self.intersection_neighbourhoods: List[int] = [
+            sum(1 << j for j in connected) | (1 << i)
+            for i, connected in enumerate(self.intersection_intersections)
+        ]
+
+        self.hex_intersections: List[Tuple[int, ...]] = [
+            tuple(
+                self.intersection_indices[h + offset]
+                for offset in Hex.CONNECTED_CORNER_OFFSETS
+            )
+            for h in self.hex_coords
+        ]
+        intersection_hexes = [[] for _ in self.intersection_coords]
+        for hex_index, corners in enumerate(self.hex_intersections):
+            for i in corners:
+                intersection_hexes[i].append(hex_index)
+        self.intersection_hexes: List[Tuple[int, ...]] = [
+            tuple(h) for h in intersection_hexes
+        ]
+
+
+def indices_in_mask(mask: int) -> Iterator[int]:
+    """Iterate over the indices of the bits set in a bitmask, from lowest to highest.
+
+    Args:
+        mask: The bitmask
+    Returns:
+        The index of each bit that is set
+    """
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
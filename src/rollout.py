@@ -0,0 +1,61 @@
+import random
+import time
+
+RANDOM = 0
+GREEDY = 1
+
+
+class Rollout:
+    """
+    plays a few plies on from an MCTS leaf with a fast policy, so that the leaf is evaluated at the state reached
+    instead. it plays on the game itself rather than on a copy, since the search already takes a snapshot of the game
+    before each iteration and restores it afterwards, which is much faster than copying it.
+    an agent searches with rollouts if it has one as its rollout attribute, next to its prune attribute
+    """
+
+    def __init__(self, plies=10, policy=RANDOM, prune=True):
+        """
+        :param plies: the most actions to make from the leaf. the rollout stops early if the game ends
+        :param policy: RANDOM to make a random action, or GREEDY to make the action with the highest prior, i.e. the
+        one that builds the most on or towards the most productive intersections
+        :param prune: whether to choose from the pruned actions, which are the fastest to generate
+        """
+        self.plies = plies
+        self.policy = policy
+        self.prune = prune
+        # the number of actions made and the time spent making them, over all the rollouts
+        self.plies_played = 0
+        self.seconds = 0.0
+
+    def play(self, game):
+        """
+        make up to plies actions in the game, leaving it in the state reached
+        :param game: the game, at the leaf's state
+        :return: the reward of the last action, which is the final reward if the game is over, or None if no actions
+        were made
+        """
+        start = time.perf_counter()
+        reward = None
+        plies = 0
+        while plies < self.plies and not game.is_over():
+            actions = game.get_actions(self.prune)
+            if self.policy == GREEDY:
+                priors = game.get_action_priors(actions)
+                action = actions[max(range(len(actions)), key=priors.__getitem__)]
+            else:
+                action = random.choice(actions)
+            reward = game.make_action(action)
+            plies += 1
+        self.plies_played += plies
+        self.seconds += time.perf_counter() - start
+        return reward
+
+    @property
+    def plies_per_second(self):
+        """the number of actions made per second over all the rollouts"""
+        return self.plies_played / self.seconds if self.seconds else 0.0
+
+    def reset_stats(self):
+        """start counting the plies and the time again"""
+        self.plies_played = 0
+        self.seconds = 0.0
@@ -192,7 +192,7 @@ while True:
                     print("    %s: %d" % (res, amount))
             trade_choice = int(input('->  '))
             trade = possible_trades[trade_choice]
-            current_player.add_resources(trade)
+            game.trade(current_player, trade)
         elif choice == 3:
             # Choose a development card
             print("What card do you want to play?")
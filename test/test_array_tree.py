@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# The search scripts live next to the package in src
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from array_tree import ACTION_NODE, STATE_NODE, ArrayTree  # noqa: E402
+
+
+def get_tree():
+    """Get a tree with two levels of states under the root, with each node's visit count set to 10 times its index."""
+    tree = ArrayTree(players_num=2, capacity=2)
+    tree.root = tree.add_state_node(-1, 0, [("a",), ("b",)])
+    root_a, root_b = tree.get_children(tree.root)
+    left = tree.add_state_node(root_a, 1, [("c",), ("d",)], state_hash=11)
+    right = tree.add_state_node(root_b, 1, [("e",)], state_hash=12)
+    left_c, left_d = tree.get_children(left)
+    below_c = tree.add_state_node(left_c, 0, [("f",), ("g",)], state_hash=13)
+    below_d = tree.add_state_node(left_d, 0, [], state_hash=14)
+    tree.chance_counts[left_d] = np.array([1.0, 2.0])
+    tree.chance_sons[left_d] = {1: below_d}
+    tree.N[: len(tree)] = np.arange(len(tree)) * 10
+    tree.w[: len(tree), 0] = np.arange(len(tree))
+    return tree, dict(left=left, right=right, below_c=below_c, below_d=below_d)
+
+
+def test_add_state_node_stores_children_next_to_each_other():
+    tree, nodes = get_tree()
+    assert len(tree) == 12
+    assert tree.node_type[nodes["left"]] == STATE_NODE
+    assert [tree.get_action(i) for i in tree.get_children(nodes["left"])] == [("c",), ("d",)]
+    assert all(tree.node_type[i] == ACTION_NODE for i in tree.get_children(nodes["left"]))
+    assert all(tree.parent[i] == nodes["left"] for i in tree.get_children(nodes["left"]))
+    assert tree.state_sons[(tree.parent[nodes["below_c"]], 13)] == nodes["below_c"]
+
+
+def test_reroot_compacts_subtree():
+    tree, nodes = get_tree()
+    old = tree.N.copy()
+    tree.reroot(nodes["left"])
+    # The left state, its two actions, and the two states under them with their two actions
+    assert len(tree) == 7
+    assert tree.root == 0
+    assert tree.chosen == -1
+    assert tree.parent[0] == -1
+    assert tree.N[0] == old[nodes["left"]]
+    assert [tree.get_action(i) for i in tree.get_children(0)] == [("c",), ("d",)]
+    # Every node's parent and children point at the moved nodes, which carried their statistics along
+    for node in range(len(tree)):
+        if tree.node_type[node] == STATE_NODE:
+            for child in tree.get_children(node):
+                assert tree.parent[child] == node
+                assert tree.node_type[child] == ACTION_NODE
+    for (action_node, state_hash), state_node in tree.state_sons.items():
+        assert tree.parent[state_node] == action_node
+        assert tree.node_type[action_node] == ACTION_NODE
+    c, d = tree.get_children(0)
+    below_c = tree.state_sons[(c, 13)]
+    below_d = tree.state_sons[(d, 14)]
+    assert tree.N[below_c] == old[nodes["below_c"]]
+    assert tree.w[below_c, 0] * 10 == old[nodes["below_c"]]
+    assert [tree.get_action(i) for i in tree.get_children(below_c)] == [("f",), ("g",)]
+    assert tree.N[below_d] == old[nodes["below_d"]]
+    assert tree.children_num[below_d] == 0
+    assert list(tree.chance_counts[d]) == [1.0, 2.0]
+    assert tree.chance_sons == {d: {1: below_d}}
+    # The right subtree is gone
+    assert tree.action_ids[("e",)] not in tree.action[: len(tree)]
+    assert all(h != 12 for _, h in tree.state_sons)
+
+
+def test_reroot_keeps_tree_usable():
+    tree, nodes = get_tree()
+    tree.reroot(nodes["left"])
+    size = len(tree)
+    c = tree.get_children(0)[0]
+    below_c = tree.state_sons[(c, 13)]
+    f = tree.get_children(below_c)[0]
+    new = tree.add_state_node(f, 1, [("h",)], state_hash=15)
+    assert new == size
+    assert tree.parent[new] == f
+    assert tree.get_action(new + 1) == ("h",)
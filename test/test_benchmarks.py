@@ -0,0 +1,262 @@
+"""Rough before/after timings for the board's hot paths.
+
+Run with ``pytest test/test_benchmarks.py -s`` to see the timings. The tests only assert that the
+fast and reference implementations agree, so that they don't fail on slow machines.
+"""
+
+import random
+from copy import deepcopy
+from time import perf_counter
+
+from pycatan import Game, Player, Resource
+from pycatan.board import BeginnerBoard, Board, BuildingType, Coords, Intersection
+from pycatan.errors import (
+    CoordsBlockedError,
+    NotConnectedError,
+    RequiresSettlementError,
+    TooCloseToBuildingError,
+)
+
+from .helpers import add_free_settlement
+
+ROADS_PER_PLAYER = 15
+STARTING_SETTLEMENTS = [Coords(1, -1), Coords(-2, 2), Coords(4, -3), Coords(-3, 5)]
+
+
+def get_board_with_roads(seed=0):
+    """Get a beginner board where each player has grown a random road network from a settlement."""
+    rng = random.Random(seed)
+    board = BeginnerBoard()
+    players = [Player(i) for i in range(len(STARTING_SETTLEMENTS))]
+    for p, c in zip(players, STARTING_SETTLEMENTS):
+        add_free_settlement(board, p, c)
+    built = {p: 0 for p in players}
+    growing = True
+    while growing:
+        growing = False
+        for p in players:
+            if built[p] >= ROADS_PER_PLAYER:
+                continue
+            options = sorted(
+                board.get_valid_road_coords(p),
+                key=lambda path: sorted((c.q, c.r) for c in path),
+            )
+            if len(options) == 0:
+                continue
+            board.add_path_building(p, BuildingType.ROAD, rng.choice(options))
+            built[p] += 1
+            growing = True
+    return board, players
+
+
+def reference_longest_road(board: Board, player: Player) -> int:
+    """Calculate the longest road the way the board originally did, scanning every path for each step."""
+    paths = [
+        e
+        for e in board.paths.values()
+        if e.building is not None and e.building.owner is player
+    ]
+    starting = [(c, [e]) for e in paths for c in e.path_coords]
+    if len(starting) == 0:
+        return 0
+    current_longest = starting[0][1]
+    potential = starting
+    while len(potential) > 0:
+        current = potential.pop(0)
+        building = board.intersections[current[0]].building
+        if building is not None and building.owner is not player:
+            continue
+        for path in filter(lambda e: current[0] in e.path_coords, board.paths.values()):
+            if (
+                path not in current[1]
+                and path.building is not None
+                and path.building.owner is player
+            ):
+                potential.append(
+                    (path.other_intersection(current[0]), [path] + current[1])
+                )
+                if len(current[1]) + 1 > len(current_longest):
+                    current_longest = [path] + current[1]
+    return len(current_longest)
+
+
+def time_calls(fn, repeat):
+    start = perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, perf_counter() - start
+
+
+def test_benchmark_longest_road():
+    board, players = get_board_with_roads()
+    for p in players:
+        before, before_time = time_calls(
+            lambda: reference_longest_road(board, p), repeat=3
+        )
+        after, after_time = time_calls(
+            lambda: board.calculate_player_longest_road(p), repeat=3
+        )
+        assert before == after
+        print(
+            "Longest road for player %d (%d): before %.2fms, after %.2fms"
+            % (p.id, after, before_time * 1000 / 3, after_time * 1000 / 3)
+        )
+
+
+def reference_connected_intersections(board: Board, coords: Coords):
+    """Get the intersections next to some coordinates the way the board originally did, by trying every offset."""
+    return [
+        board.intersections[coords + offset]
+        for offset in Intersection.CONNECTED_CORNER_OFFSETS
+        if coords + offset in board.intersections
+    ]
+
+
+def reference_assert_valid_settlement_coords(
+    board: Board, coords: Coords, player: Player
+):
+    """Check a settlement location the way the board originally did, raising an error if it isn't valid."""
+    if board.intersections[coords].building is not None:
+        raise CoordsBlockedError("There is already a building on this intersection")
+    connected = reference_connected_intersections(board, coords)
+    if any(i.building is not None for i in connected):
+        raise TooCloseToBuildingError(
+            "There is a building that is not at least 2 paths away from this position"
+        )
+    paths = [board.paths[frozenset({coords, i.coords})] for i in connected]
+    if not any(p.building is not None and p.building.owner is player for p in paths):
+        raise NotConnectedError("The settlement must be connected by road")
+
+
+def reference_assert_valid_city_coords(board: Board, coords: Coords, player: Player):
+    """Check a city location the way the board originally did, raising an error if it isn't valid."""
+    building = board.intersections[coords].building
+    if (
+        building is None
+        or building.owner is not player
+        or building.building_type is not BuildingType.SETTLEMENT
+    ):
+        raise RequiresSettlementError(
+            "You must update an existing settlement owned by the player into a city"
+        )
+
+
+def reference_assert_valid_road_coords(board: Board, path_coords, player: Player):
+    """Check a road location the way the board originally did, raising an error if it isn't valid."""
+    if board.paths[frozenset(path_coords)].building is not None:
+        raise CoordsBlockedError("There is already a building on this path")
+    for coords in path_coords:
+        building = board.intersections[coords].building
+        if building is not None and building.owner is player:
+            return
+    for coords in path_coords:
+        for i in reference_connected_intersections(board, coords):
+            connected_path = board.paths[frozenset({coords, i.coords})]
+            if (
+                connected_path.building is not None
+                and connected_path.building.owner is player
+            ):
+                # Checks that we aren't going through an enemy building to be connected
+                building = board.intersections[coords].building
+                if building is None or building.owner is player:
+                    return
+    raise NotConnectedError("Road is not connected to any other building")
+
+
+def enumerate_moves_with_exceptions(board: Board, player: Player):
+    """Find every legal building location the way the board originally did, catching the errors raised by its checks."""
+
+    def is_valid(assertion, *args):
+        try:
+            assertion(board, *args)
+        except Exception:
+            return False
+        return True
+
+    return (
+        {
+            c
+            for c in board.intersections
+            if is_valid(reference_assert_valid_settlement_coords, c, player)
+        },
+        {
+            c
+            for c in board.intersections
+            if is_valid(reference_assert_valid_city_coords, c, player)
+        },
+        {
+            p
+            for p in board.paths
+            if is_valid(reference_assert_valid_road_coords, p, player)
+        },
+    )
+
+
+def enumerate_moves(board: Board, player: Player):
+    return (
+        board.get_valid_settlement_coords(player),
+        board.get_valid_city_coords(player),
+        board.get_valid_road_coords(player),
+    )
+
+
+def test_benchmark_legal_move_enumeration():
+    board, players = get_board_with_roads()
+    repeat = 20
+    for p in players:
+        before, before_time = time_calls(
+            lambda: enumerate_moves_with_exceptions(board, p), repeat=repeat
+        )
+        after, after_time = time_calls(lambda: enumerate_moves(board, p), repeat=repeat)
+        assert before == after
+        print(
+            "Legal moves for player %d: before %.2fms, after %.2fms"
+            % (p.id, before_time * 1000 / repeat, after_time * 1000 / repeat)
+        )
+
+
+def test_benchmark_roll_yield():
+    board, players = get_board_with_roads()
+    board.add_intersection_building(players[0], Coords(1, -1), BuildingType.CITY)
+    for p in players:
+        options = board.get_valid_settlement_coords(p)
+        if options:
+            add_free_settlement(board, p, min(options, key=lambda c: (c.q, c.r)))
+    board.robber = Coords(1, 1)
+    repeat = 200
+    for roll in range(2, 13):
+        before, before_time = time_calls(
+            lambda: board.get_yield_for_roll(roll), repeat=repeat
+        )
+        after, after_time = time_calls(
+            lambda: board.get_resource_deltas_for_roll(roll), repeat=repeat
+        )
+        for p in players:
+            expected = before[p].total_yield if p in before else {}
+            assert {
+                r: after[board.get_player_slot(p), r.value]
+                for r in Resource
+                if after[board.get_player_slot(p), r.value]
+            } == {r: n for r, n in expected.items() if n}
+        print(
+            "Yield for roll %d: before %.3fms, after %.3fms"
+            % (roll, before_time * 1000 / repeat, after_time * 1000 / repeat)
+        )
+
+
+def test_benchmark_snapshot_restore():
+    game = Game(BeginnerBoard())
+    board, _ = get_board_with_roads()
+    game.board = board
+    repeat = 200
+    _, before_time = time_calls(lambda: deepcopy(game), repeat=repeat)
+    snapshot = game.snapshot()
+    _, after_time = time_calls(lambda: game.restore(game.snapshot()), repeat=repeat)
+    game.restore(snapshot)
+    assert game.board.calculate_player_longest_road(board.players[0]) == (
+        reference_longest_road(board, board.players[0])
+    )
+    print(
+        "Copying the game: deepcopy %.3fms, snapshot and restore %.3fms"
+        % (before_time * 1000 / repeat, after_time * 1000 / repeat)
+    )
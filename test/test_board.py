@@ -1,7 +1,18 @@
 from typing import Set
+import numpy as np
 import pytest
 
-from pycatan.board import Board, BeginnerBoard, Coords, Hex, HexType, BuildingType
+from pycatan.board import (
+    Board,
+    BeginnerBoard,
+    Coords,
+    Hex,
+    HexType,
+    BuildingType,
+    InvalidReason,
+    IntersectionBuilding,
+    PathBuilding,
+)
 from pycatan import Player, Resource
 from pycatan.errors import (
     InvalidCoordsError,
@@ -107,6 +118,34 @@ def test_board_properly_keys_paths():
         assert path.path_coords == set(key)
 
 
+def test_board_topology_matches_coords():
+    board = BeginnerBoard()
+    topology = board.topology
+    assert len(topology.hex_coords) == 19
+    assert len(topology.intersection_coords) == 54
+    assert len(topology.path_coords) == 72
+    for index, coords in enumerate(topology.intersection_coords):
+        connected = {
+            topology.intersection_coords[i]
+            for i in topology.intersection_intersections[index]
+        }
+        assert connected == set(
+            i.coords
+            for i in board.get_intersection_connected_intersections(
+                board.intersections[coords]
+            )
+        )
+        for p in topology.intersection_paths[index]:
+            assert coords in topology.path_coords[p]
+            assert index in topology.path_intersections[p]
+    for index, coords in enumerate(topology.hex_coords):
+        assert {
+            topology.intersection_coords[i] for i in topology.hex_intersections[index]
+        } == {coords + o for o in Hex.CONNECTED_CORNER_OFFSETS}
+        for i in topology.hex_intersections[index]:
+            assert index in topology.intersection_hexes[i]
+
+
 def test_cannot_build_in_middle_of_hex():
     board = BeginnerBoard()
     player = Player()
@@ -350,6 +389,84 @@ def test_robber_doesnt_stop_yield_after_leaving():
     assert b.get_yield_for_roll(4)[p].total_yield == get_resource_hand(wool=1)
 
 
+def test_get_resource_deltas_for_roll():
+    b = BeginnerBoard()
+    p1 = Player(0)
+    p2 = Player(1)
+    add_free_city(b, p1, Coords(0, 2))
+    add_free_settlement(b, p2, Coords(1, 0))
+    deltas = b.get_resource_deltas_for_roll(3)
+    assert deltas.shape == (2, len(Resource))
+    assert list(deltas[0]) == [2, 0, 0, 0, 0]
+    assert list(deltas[1]) == [0, 0, 0, 0, 0]
+    assert list(b.get_resource_deltas_for_roll(4)[:, Resource.WOOL.value]) == [2, 1]
+    b.robber = Coords(1, 1)
+    assert list(b.get_resource_deltas_for_roll(4)[:, Resource.WOOL.value]) == [0, 0]
+    assert not b.get_resource_deltas_for_roll(7).any()
+
+
+def test_get_expected_production():
+    b = BeginnerBoard()
+    production = b.get_expected_production()
+    assert production.shape == (54, len(Resource))
+    for coords, index in b.topology.intersection_indices.items():
+        expected = {r: 0 for r in Resource}
+        for h in b.get_hexes_connected_to_intersection(coords):
+            hex = b.hexes[h]
+            if hex.token_number is not None and h != b.robber:
+                expected[hex.hex_type.get_resource()] += (
+                    6 - abs(7 - hex.token_number)
+                ) / 36
+        assert list(production[index]) == pytest.approx([expected[r] for r in Resource])
+    with pytest.raises(ValueError):
+        production[0, 0] = 1
+
+
+def test_expected_production_updates_when_robber_moves():
+    b = BeginnerBoard()
+    p = Player(0)
+    add_free_city(b, p, Coords(1, 0))
+    production = b.get_expected_production()
+    index = b.topology.intersection_indices[Coords(1, 0)]
+    # The hex at (1, 1) is a pasture with a 4 token
+    assert production[index, Resource.WOOL.value] == pytest.approx(3 / 36)
+    assert b.get_expected_resource_deltas()[0, Resource.WOOL.value] == pytest.approx(
+        6 / 36
+    )
+    b.robber = Coords(1, 1)
+    assert b.get_expected_production()[index, Resource.WOOL.value] == 0
+    assert production[index, Resource.WOOL.value] == 0
+    assert b.get_expected_resource_deltas()[0, Resource.WOOL.value] == 0
+
+
+def test_production_cache_follows_robber():
+    b = BeginnerBoard()
+    for coords in [
+        Coords(1, 1),
+        Coords(0, 0),
+        Coords(1, 1),
+        Coords(2, -1),
+        b.robber,
+    ]:
+        b.robber = coords
+        # Boards can index their intersections differently, so line them up by coordinates
+        fresh = Board(set(b.hexes.values()), robber=coords)
+        rows = [
+            fresh.topology.intersection_indices[c]
+            for c in b.topology.intersection_coords
+        ]
+        for roll in range(2, 13):
+            assert (
+                b.get_production_for_roll(roll)
+                == fresh.get_production_for_roll(roll)[rows]
+            ).all()
+        assert b.get_expected_production() == pytest.approx(
+            fresh.get_expected_production()[rows]
+        )
+    with pytest.raises(ValueError):
+        b.get_production_for_roll(6)[0, 0] = 1
+
+
 def test_is_valid_hex_coords():
     b = BeginnerBoard()
     assert b.is_valid_hex_coords(Coords(0, 0))
@@ -469,6 +586,123 @@ def test_calculate_longest_road_multiple_players():
     assert b.calculate_player_longest_road(p2) == 6
 
 
+def test_paths_have_ids():
+    b = BeginnerBoard()
+    path_coords = frozenset({Coords(1, 0), Coords(0, 1)})
+    path_id = b.get_path_id({Coords(0, 1), Coords(1, 0)})
+    assert b.get_path_coords(path_id) == path_coords
+    assert sorted(b.get_path_id(p) for p in b.paths) == list(range(len(b.paths)))
+    with pytest.raises(ValueError):
+        b.get_path_id({Coords(1, 0), Coords(0, 0)})
+
+
+def test_can_build_road_using_path_id():
+    b = BeginnerBoard()
+    p = Player(0)
+    add_free_settlement(b, p, Coords(1, 0))
+    path_id = b.get_path_id({Coords(1, 0), Coords(0, 1)})
+    assert path_id in b.get_valid_road_ids(p)
+    b.add_path_building(p, BuildingType.ROAD, path_id)
+    assert b.paths[frozenset({Coords(1, 0), Coords(0, 1)})].building.owner is p
+    assert b.paths[frozenset({Coords(1, 0), Coords(0, 1)})].building.path_coords == {
+        Coords(1, 0),
+        Coords(0, 1),
+    }
+    assert path_id not in b.get_valid_road_ids(p)
+    assert b.calculate_player_longest_road(p) == 1
+
+
+def test_can_build_road_using_numpy_path_id():
+    b = BeginnerBoard()
+    p = Player(0)
+    add_free_settlement(b, p, Coords(1, 0))
+    path_id = np.int64(b.get_path_id({Coords(1, 0), Coords(0, 1)}))
+    b.add_path_building(p, BuildingType.ROAD, path_id)
+    assert b.path_owners[path_id] == 0
+    with pytest.raises(ValueError):
+        b.add_path_building(p, BuildingType.ROAD, np.int64(len(b.paths)))
+
+
+def test_board_state_is_stored_in_arrays():
+    b = BeginnerBoard()
+    p1 = Player(0)
+    p2 = Player(1)
+    b.register_players([p1, p2])
+    add_free_city(b, p2, Coords(1, 0))
+    add_free_road(b, p2, {Coords(1, 0), Coords(0, 1)})
+    index = b.topology.intersection_indices[Coords(1, 0)]
+    path_id = b.get_path_id({Coords(1, 0), Coords(0, 1)})
+    assert b.players == [p1, p2]
+    assert b.intersection_owners.dtype == np.int8
+    assert b.intersection_owners[index] == 1
+    assert b.intersection_types[index] == BuildingType.CITY.value
+    assert b.path_owners[path_id] == 1
+    assert list(np.flatnonzero(b.intersection_owners >= 0)) == [index]
+    assert list(np.flatnonzero(b.path_owners >= 0)) == [path_id]
+    b.remove_intersection_building(Coords(1, 0))
+    assert b.intersection_owners[index] == -1
+    assert b.intersection_types[index] == 0
+
+
+def test_buildings_are_views_of_arrays():
+    b = BeginnerBoard()
+    p = Player(0)
+    add_free_settlement(b, p, Coords(1, 0))
+    building = b.intersections[Coords(1, 0)].building
+    assert building is b.intersections[Coords(1, 0)].building
+    index = b.topology.intersection_indices[Coords(1, 0)]
+    assert b.intersection_types[index] == BuildingType.SETTLEMENT.value
+    # Changing the board changes both the arrays and the building
+    b.add_intersection_building(p, Coords(1, 0), building_type=BuildingType.CITY)
+    assert b.intersection_types[index] == BuildingType.CITY.value
+    assert b.intersections[Coords(1, 0)].building.building_type is BuildingType.CITY
+    assert b.intersections[Coords(1, 0)].building.owner is p
+    b.remove_intersection_building(Coords(1, 0))
+    assert b.intersection_owners[index] == -1
+    assert b.intersections[Coords(1, 0)].building is None
+    # The arrays are read only
+    for array in (b.intersection_owners, b.intersection_types, b.path_owners):
+        with pytest.raises(ValueError):
+            array[0] = 0
+
+
+def test_get_paths_for_intersection_coords():
+    b = BeginnerBoard()
+    paths = b.get_paths_for_intersection_coords(Coords(1, 0))
+    assert paths == {p for c, p in b.paths.items() if Coords(1, 0) in c}
+    # The set returned is the caller's to change
+    paths.clear()
+    assert len(b.get_paths_for_intersection_coords(Coords(1, 0))) == 3
+
+
+def test_assigning_building_updates_board():
+    b = BeginnerBoard()
+    p = Player(0)
+    b.intersections[Coords(1, 0)].building = IntersectionBuilding(
+        p, BuildingType.SETTLEMENT, Coords(1, 0)
+    )
+    assert b.intersection_owners[b.topology.intersection_indices[Coords(1, 0)]] == 0
+    assert Coords(0, 1) not in b.get_valid_settlement_coords(p, ensure_connected=False)
+    # The player can build roads from the settlement before they have any roads
+    assert b.is_valid_road_coords(p, {Coords(1, 0), Coords(0, 1)})
+    assert len(b.get_valid_road_coords(p)) == 3
+    b.paths[frozenset({Coords(1, 0), Coords(0, 1)})].building = PathBuilding(
+        p, BuildingType.ROAD, {Coords(1, 0), Coords(0, 1)}
+    )
+    assert b.calculate_player_longest_road(p) == 1
+    assert b.is_valid_road_coords(p, {Coords(0, 1), Coords(0, 2)})
+
+
+def test_robber_is_stored_as_hex_index():
+    b = BeginnerBoard()
+    b.robber = Coords(1, 1)
+    assert b.topology.hex_coords[b.robber_index] == Coords(1, 1)
+    b.robber_index = b.topology.hex_indices[Coords(0, 0)]
+    assert b.robber == Coords(0, 0)
+    with pytest.raises(InvalidCoordsError):
+        b.robber = Coords(1, 0)
+
+
 def test_allow_building_road_only_connected_to_settlement():
     b = BeginnerBoard()
     p = Player()
@@ -488,6 +722,31 @@ def test_can_break_longest_road_with_settlement():
     assert b.calculate_player_longest_road(p1) == 2
 
 
+def test_removing_buildings_updates_longest_road():
+    b = BeginnerBoard()
+    p1 = Player(0)
+    p2 = Player(1)
+    path = (Coords(1, -1), Coords(1, 0), Coords(0, 1), Coords(0, 2), Coords(-1, 3))
+    add_free_road_from_path(b, p1, path)
+    add_free_settlement(b, p2, Coords(0, 1))
+    assert b.calculate_player_longest_road(p1) == 2
+    b.remove_intersection_building(Coords(0, 1))
+    assert b.intersections[Coords(0, 1)].building is None
+    assert b.calculate_player_longest_road(p1) == 4
+    b.remove_path_building({Coords(0, 2), Coords(-1, 3)})
+    assert b.paths[frozenset({Coords(0, 2), Coords(-1, 3)})].building is None
+    assert b.calculate_player_longest_road(p1) == 3
+
+
+def test_removing_settlement_disconnects_harbor():
+    b = BeginnerBoard()
+    p = Player(0)
+    add_free_settlement(b, p, Coords(4, 0))
+    assert len(p.connected_harbors) == 1
+    b.remove_intersection_building(Coords(4, 0))
+    assert len(p.connected_harbors) == 0
+
+
 def test_cannot_build_road_through_enemy_settlement():
     b = BeginnerBoard()
     p1 = Player()
@@ -576,6 +835,54 @@ def test_get_valid_settlement_coords_too_close():
     assert b.get_valid_settlement_coords(p) == {Coords(-1, 1)}
 
 
+def test_get_valid_settlement_coords_after_removing_buildings():
+    b = BeginnerBoard()
+    p = Player(0)
+    add_free_road(b, p, {Coords(1, 0), Coords(0, 1)})
+    add_free_settlement(b, p, Coords(1, 0))
+    assert not b.get_valid_settlement_coords(p)
+    b.remove_intersection_building(Coords(1, 0))
+    assert b.get_valid_settlement_coords(p) == {Coords(0, 1), Coords(1, 0)}
+    b.remove_path_building({Coords(1, 0), Coords(0, 1)})
+    assert not b.get_valid_settlement_coords(p)
+    assert len(b.get_valid_settlement_coords(p, ensure_connected=False)) == len(
+        b.intersections
+    )
+
+
+def test_check_coords_returns_reason():
+    b = BeginnerBoard()
+    p1 = Player(0)
+    p2 = Player(1)
+    add_free_settlement(b, p1, Coords(1, 0))
+    assert b.check_settlement_coords(p1, Coords(0, 0), False) is (
+        InvalidReason.INVALID_INTERSECTION
+    )
+    assert b.check_settlement_coords(p1, Coords(1, 0), False) is (
+        InvalidReason.INTERSECTION_BLOCKED
+    )
+    assert b.check_settlement_coords(p1, Coords(0, 1), False) is (
+        InvalidReason.TOO_CLOSE_TO_BUILDING
+    )
+    assert b.check_settlement_coords(p1, Coords(-1, 1), True) is (
+        InvalidReason.SETTLEMENT_NOT_CONNECTED
+    )
+    assert b.check_settlement_coords(p1, Coords(-1, 1), False) is None
+    assert b.check_city_coords(p2, Coords(1, 0)) is InvalidReason.REQUIRES_SETTLEMENT
+    assert b.check_city_coords(p1, Coords(1, 0)) is None
+    assert b.check_road_coords(p1, {Coords(1, 0), Coords(0, 0)}) is (
+        InvalidReason.INVALID_PATH
+    )
+    assert b.check_road_coords(p2, {Coords(1, 0), Coords(0, 1)}) is (
+        InvalidReason.ROAD_NOT_CONNECTED
+    )
+    assert b.check_road_coords(p1, {Coords(1, 0), Coords(0, 1)}) is None
+    add_free_road(b, p1, {Coords(1, 0), Coords(0, 1)})
+    assert b.check_road_coords(p1, {Coords(1, 0), Coords(0, 1)}) is (
+        InvalidReason.PATH_BLOCKED
+    )
+
+
 def test_get_valid_city_coords():
     b = BeginnerBoard()
     p = Player()
@@ -618,6 +925,31 @@ def test_get_valid_road_coords():
     }
 
 
+def test_get_valid_road_coords_blocked_by_enemy_settlement():
+    b = BeginnerBoard()
+    p1 = Player(0)
+    p2 = Player(1)
+    add_free_road(b, p1, {Coords(1, 0), Coords(0, 1)})
+    assert b.get_valid_road_coords(p1) == {
+        frozenset({Coords(1, 0), Coords(1, -1)}),
+        frozenset({Coords(1, 0), Coords(2, 0)}),
+        frozenset({Coords(0, 1), Coords(-1, 1)}),
+        frozenset({Coords(0, 1), Coords(0, 2)}),
+    }
+    add_free_settlement(b, p2, Coords(0, 1))
+    assert b.get_valid_road_coords(p1) == {
+        frozenset({Coords(1, 0), Coords(1, -1)}),
+        frozenset({Coords(1, 0), Coords(2, 0)}),
+    }
+    assert b.get_valid_road_coords(p2) == {
+        frozenset({Coords(0, 1), Coords(-1, 1)}),
+        frozenset({Coords(0, 1), Coords(0, 2)}),
+    }
+    b.remove_intersection_building(Coords(0, 1))
+    assert len(b.get_valid_road_coords(p1)) == 4
+    assert not b.get_valid_road_coords(p2)
+
+
 def test_get_hex_resources_for_intersection():
     b = BeginnerBoard()
     assert b.get_hex_resources_for_intersection(Coords(1, 0)) == {
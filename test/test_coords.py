@@ -1,3 +1,8 @@
+import copy
+import pickle
+
+import pytest
+
 from pycatan.board import Coords
 
 
@@ -9,3 +14,26 @@ def test_can_use_coord_as_key_in_dict():
     d = {Coords(0, 1): True, Coords(1, 2): False}
     assert d[Coords(0, 1)]
     assert not d[Coords(1, 2)]
+
+
+def test_coords_are_interned():
+    assert Coords(1, 2) is Coords(1, 2)
+    assert Coords(1, 2) + Coords(0, -1) is Coords(1, 1)
+    assert Coords(1, 2) - Coords(1, 2) is Coords(0, 0)
+
+
+def test_coords_outside_intern_range_are_equal():
+    assert Coords(1000, 0) == Coords(1000, 0)
+    assert hash(Coords(1000, 0)) == hash(Coords(1000, 0))
+
+
+def test_coords_are_immutable():
+    c = Coords(1, 2)
+    with pytest.raises(AttributeError):
+        c.q = 3
+
+
+def test_coords_can_be_copied():
+    c = Coords(1, 2)
+    assert copy.deepcopy(c) is c
+    assert pickle.loads(pickle.dumps(c)) is c
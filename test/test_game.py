@@ -406,3 +406,187 @@ def test_get_victory_points_complicated():
     assert g.get_victory_points(g.players[2]) == 4
     assert g.get_victory_points(g.players[1]) == 8
     assert g.get_victory_points(g.players[0]) == 3
+
+
+def test_snapshot_restore():
+    g = Game(BeginnerBoard())
+    p = g.players[0]
+    g.build_settlement(p, Coords(1, 0), cost_resources=False, ensure_connected=False)
+    p.add_resources(get_resource_hand(brick=2, lumber=2))
+    build_road_along_path(g, p, (Coords(1, 0), Coords(0, 1), Coords(0, 2)))
+    snapshot = g.snapshot()
+    valid_roads = g.board.get_valid_road_coords(p)
+    valid_settlements = g.board.get_valid_settlement_coords(p)
+
+    p.add_resources(get_resource_hand(brick=5, lumber=5, ore=4, grain=3, wool=1))
+    g.build_road(p, {Coords(0, 2), Coords(-1, 3)})
+    g.build_settlement(p, Coords(4, 0), cost_resources=False, ensure_connected=False)
+    g.upgrade_settlement_to_city(p, Coords(1, 0))
+    g.build_settlement(g.players[1], Coords(-1, 3), False, False)
+    g.move_robber(Coords(1, 1))
+    g.longest_road_owner = p
+    card = g.build_development_card(p)
+
+    g.restore(snapshot)
+    assert g.board.intersections[Coords(1, 0)].building.building_type is (
+        BuildingType.SETTLEMENT
+    )
+    assert g.board.intersections[Coords(4, 0)].building is None
+    assert g.board.intersections[Coords(-1, 3)].building is None
+    assert g.board.paths[frozenset({Coords(0, 2), Coords(-1, 3)})].building is None
+    assert g.board.get_valid_road_coords(p) == valid_roads
+    assert g.board.get_valid_settlement_coords(p) == valid_settlements
+    assert g.board.calculate_player_longest_road(p) == 2
+    assert g.board.robber == Coords(0, 0)
+    assert g.longest_road_owner is None
+    assert p.resources == get_resource_hand()
+    assert p.development_cards[card] == 0
+    assert len(p.connected_harbors) == 0
+    assert len(g.development_card_deck) == 25
+    assert g.get_victory_points(p) == 1
+    # The same snapshot can be restored more than once
+    g.build_road(p, {Coords(0, 2), Coords(-1, 3)}, cost_resources=False)
+    assert g.board.calculate_player_longest_road(p) == 3
+    g.restore(snapshot)
+    assert g.board.calculate_player_longest_road(p) == 2
+
+
+def test_restore_later_snapshot_after_earlier_one():
+    g = Game(BeginnerBoard())
+    p = g.players[0]
+    first = g.snapshot()
+    g.build_settlement(p, Coords(1, 0), cost_resources=False, ensure_connected=False)
+    second = g.snapshot()
+    g.restore(first)
+    g.restore(second)
+    assert g.board.intersections[Coords(1, 0)].building.owner is p
+    # The journal is restored along with the board, so the settlement can still be undone
+    g.undo()
+    assert g.board.intersections[Coords(1, 0)].building is None
+    with pytest.raises(ValueError):
+        g.undo()
+
+
+def test_trade():
+    g = Game(BeginnerBoard())
+    p = g.players[0]
+    p.add_resources(get_resource_hand(ore=4))
+    g.trade(p, {Resource.ORE: -4, Resource.WOOL: 1})
+    assert p.resources == get_resource_hand(wool=1)
+    with pytest.raises(NotEnoughResourcesError):
+        g.trade(p, {Resource.ORE: -4, Resource.WOOL: 1})
+
+
+def test_undo_reverts_changes_in_order():
+    g = Game(BeginnerBoard())
+    p1 = g.players[0]
+    p2 = g.players[1]
+    empty_hash = g.state_hash
+    g.build_settlement(p1, Coords(4, 0), cost_resources=False, ensure_connected=False)
+    g.build_settlement(p2, Coords(-2, 0), cost_resources=False, ensure_connected=False)
+    g.add_yield_for_roll(6)
+    p1.add_resources(get_resource_hand(brick=9, lumber=5, ore=4, grain=4, wool=2))
+    start = {p: dict(p.resources) for p in g.players}
+    start_hash = g.state_hash
+    board_state = (
+        g.board.intersection_owners.copy(),
+        g.board.intersection_types.copy(),
+        g.board.path_owners.copy(),
+    )
+    valid_roads = g.board.get_valid_road_coords(p1)
+
+    build_road_along_path(
+        g,
+        p1,
+        (Coords(4, 0), Coords(3, 1), Coords(2, 1), Coords(1, 2), Coords(0, 2)),
+    )
+    g.build_road(p1, {Coords(0, 2), Coords(-1, 3)})
+    assert g.longest_road_owner is p1
+    g.upgrade_settlement_to_city(p1, Coords(4, 0))
+    g.move_robber(Coords(1, 1))
+    g.add_yield({p2: get_roll_yield(lumber=2)})
+    g.trade(p1, {Resource.BRICK: -4, Resource.ORE: 1})
+    card = g.build_development_card(p1)
+
+    for _ in range(10):
+        g.undo()
+    assert g.development_card_deck[0] is card
+    assert len(g.development_card_deck) == 25
+    assert p1.development_cards[card] == 0
+    assert g.board.robber == Coords(0, 0)
+    assert g.longest_road_owner is None
+    assert g.board.calculate_player_longest_road(p1) == 0
+    assert g.board.get_valid_road_coords(p1) == valid_roads
+    assert g.board.intersections[Coords(4, 0)].building.building_type is (
+        BuildingType.SETTLEMENT
+    )
+    assert len(p1.connected_harbors) == 1
+    assert {p: p.resources for p in g.players} == start
+    assert (g.board.intersection_owners == board_state[0]).all()
+    assert (g.board.intersection_types == board_state[1]).all()
+    assert (g.board.path_owners == board_state[2]).all()
+    assert g.state_hash == start_hash
+
+    # Undo adding the yield and the settlements
+    for _ in range(3):
+        g.undo()
+    assert p1.resources == get_resource_hand(brick=9, lumber=5, ore=4, grain=4, wool=2)
+    assert p2.resources == get_resource_hand()
+    assert not (g.board.intersection_owners >= 0).any()
+    assert len(p1.connected_harbors) == 0
+    p1.remove_resources(get_resource_hand(brick=9, lumber=5, ore=4, grain=4, wool=2))
+    assert g.state_hash == empty_hash
+    with pytest.raises(ValueError):
+        g.undo()
+
+
+def test_state_hash():
+    games = [Game(BeginnerBoard()) for _ in range(2)]
+    assert games[0].state_hash == games[1].state_hash
+    empty_hash = games[0].state_hash
+    hashes = {empty_hash}
+    g = games[0]
+    g.build_settlement(
+        g.players[0], Coords(4, 0), cost_resources=False, ensure_connected=False
+    )
+    g.build_settlement(
+        g.players[1], Coords(-2, 0), cost_resources=False, ensure_connected=False
+    )
+    g.build_road(g.players[0], {Coords(4, 0), Coords(3, 1)}, cost_resources=False)
+    g.add_yield({g.players[1]: get_roll_yield(ore=2)})
+    g.move_robber(Coords(1, 1))
+    # The same changes in a different order
+    g = games[1]
+    g.move_robber(Coords(1, 1))
+    g.add_yield({g.players[1]: get_roll_yield(ore=2)})
+    g.build_settlement(
+        g.players[1], Coords(-2, 0), cost_resources=False, ensure_connected=False
+    )
+    g.build_settlement(
+        g.players[0], Coords(4, 0), cost_resources=False, ensure_connected=False
+    )
+    g.build_road(g.players[0], {Coords(4, 0), Coords(3, 1)}, cost_resources=False)
+    # The hash only depends on the state, not on the board or the order of the changes
+    assert games[0].state_hash == games[1].state_hash
+    assert games[0].state_hash != empty_hash
+    g = games[0]
+    snapshot = g.snapshot()
+    hashes.add(g.state_hash)
+    g.upgrade_settlement_to_city(g.players[0], Coords(4, 0), cost_resources=False)
+    hashes.add(g.state_hash)
+    g.turn = 1
+    hashes.add(g.state_hash)
+    g.phase = 2
+    hashes.add(g.state_hash)
+    g.players[1].remove_resources(get_resource_hand(ore=1))
+    hashes.add(g.state_hash)
+    g.longest_road_owner = g.players[0]
+    hashes.add(g.state_hash)
+    assert len(hashes) == 7
+    g.restore(snapshot)
+    assert g.state_hash == games[1].state_hash
+    # Undoing the changes gives back the original hash
+    for g in games:
+        for _ in range(5):
+            g.undo()
+        assert g.state_hash == empty_hash
@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The search scripts live next to the package in src and need PyTorch, which the package doesn't
+torch = pytest.importorskip("torch")
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from inference_server import InferenceServer  # noqa: E402
+
+
+class DoublingModel:
+    def forward(self, x):
+        return x * 2
+
+
+def test_server_batches_requests():
+    with InferenceServer(DoublingModel(), max_batch_size=4, timeout=0.05) as server:
+        futures = [server.submit(torch.Tensor([i])) for i in range(4)]
+        assert [f.result(timeout=5).item() for f in futures] == [0, 2, 4, 6]
+        assert server.forward(torch.Tensor([[1], [2]])).tolist() == [[2], [4]]
+    assert server.get_stats()["states"] == 6
+
+
+def test_close_serves_pending_requests():
+    server = InferenceServer(DoublingModel(), max_batch_size=8, timeout=1)
+    futures = [server.submit(torch.Tensor([i])) for i in range(3)]
+    # Closing doesn't wait for the timeout, and the requests already submitted are still evaluated
+    server.close()
+    assert [f.result(timeout=0).item() for f in futures] == [0, 2, 4]
+
+
+def test_submit_after_close_raises():
+    server = InferenceServer(DoublingModel())
+    server.close()
+    with pytest.raises(RuntimeError):
+        server.submit(torch.Tensor([1]))
+    with pytest.raises(RuntimeError):
+        server.forward(torch.Tensor([1]))
+    # Closing again does nothing
+    server.close()
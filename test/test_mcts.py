@@ -0,0 +1,298 @@
+import math
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# The search scripts live next to the package in src and need PyTorch, which the package doesn't
+torch = pytest.importorskip("torch")
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from array_tree import ArrayTree  # noqa: E402
+from mcts import (  # noqa: E402
+    REPLACE_DEEPEST,
+    REPLACE_LRU,
+    MCTSTree,
+    TranspositionTable,
+    array_back_propagation,
+    array_batch_iteration,
+    array_iteration,
+    mcts_get_best_action,
+    select_uct,
+)
+
+
+class CountingGame:
+    """A game where two players take turns adding to a running total, which ends once it reaches the target.
+
+    Implements just the parts of the Catan wrapper that the search uses. The action (0,) adds a dice roll, and is
+    the chance action.
+    """
+
+    def __init__(self, actions=((1,), (2,)), target=100, outcomes=((1, 0.5), (2, 0.5))):
+        self.actions = list(actions)
+        self.target = target
+        self.outcomes = list(outcomes)
+        self.total = 0
+        self.cur_id_player = 0
+
+    @property
+    def state_hash(self):
+        return hash((self.total, self.cur_id_player))
+
+    @staticmethod
+    def get_players_num():
+        return 2
+
+    def get_chance_outcomes(self):
+        return self.outcomes
+
+    @staticmethod
+    def is_chance_action(action):
+        return action[0] == 0
+
+    def get_turn(self):
+        return self.cur_id_player
+
+    def get_actions(self, prune=True):
+        return list(self.actions)
+
+    def get_action_priors(self, actions):
+        return [action[0] for action in actions]
+
+    def make_action(self, action, dice=None):
+        if self.is_chance_action(action):
+            if dice is None:
+                dice = random.choices(*zip(*self.outcomes))[0]
+            self.total += dice
+        else:
+            self.total += action[0]
+        self.cur_id_player = 1 - self.cur_id_player
+        if self.is_over():
+            return torch.Tensor([1, 0] if self.cur_id_player == 1 else [0, 1])
+        return torch.Tensor([0, 0])
+
+    def is_over(self):
+        return self.total >= self.target
+
+    def snapshot(self):
+        return self.total, self.cur_id_player
+
+    def restore(self, snapshot):
+        self.total, self.cur_id_player = snapshot
+
+    def get_state(self):
+        return torch.Tensor([self.total, self.cur_id_player])
+
+    def heuristic(self, state):
+        return torch.zeros(2)
+
+
+class ConstantModel:
+    """A model that values every state the same."""
+
+    def forward(self, x):
+        return torch.ones(x.shape[:-1] + (2,))
+
+
+class TotalModel:
+    """A model that values the states with higher totals more for the first player.
+
+    Records the visit count of the tree's root each time it is called.
+    """
+
+    def __init__(self, tree=None):
+        self.tree = tree
+        self.root_visits = []
+
+    def forward(self, x):
+        if self.tree is not None:
+            self.root_visits.append(int(self.tree.N[self.tree.root]))
+        return torch.stack([x[..., 0] + 1, torch.ones_like(x[..., 0])], -1)
+
+
+def get_array_tree(game):
+    """Get an ArrayTree with just the game's current state."""
+    tree = ArrayTree(game.get_players_num())
+    tree.root = tree.add_state_node(-1, game.get_turn(), game.get_actions())
+    return tree
+
+
+class Agent:
+    def __init__(self, model=None, prune=True):
+        self.model = model or ConstantModel()
+        self.prune = prune
+
+
+def test_transposition_table_evicts_least_recently_used():
+    table = TranspositionTable(2)
+    table.put(1, "a", 0)
+    table.put(2, "b", 1)
+    assert table.get(1) == "a"
+    assert table.put(3, "c", 1)
+    assert len(table) == 2
+    assert table.get(2) is None
+    assert table.get(1) == "a"
+    assert table.get(3) == "c"
+
+
+def test_transposition_table_prefers_shallow_nodes():
+    table = TranspositionTable(2, REPLACE_DEEPEST)
+    table.put(1, "a", 1)
+    table.put(2, "b", 3)
+    # A node deeper than every node in the full table isn't added
+    assert not table.put(3, "c", 5)
+    assert table.get(3) is None
+    # A shallower one replaces the deepest node
+    assert table.put(4, "d", 2)
+    assert table.get(2) is None
+    assert table.get(1) == "a"
+    assert table.get(4) == "d"
+
+
+def test_transposition_table_needs_capacity():
+    with pytest.raises(ValueError):
+        TranspositionTable(0)
+
+
+@pytest.mark.parametrize("replacement", [REPLACE_LRU, REPLACE_DEEPEST])
+def test_transposition_table_keeps_root(replacement):
+    game = CountingGame()
+    table = TranspositionTable(3, replacement)
+    tree = MCTSTree()
+    mcts_get_best_action(game, [Agent()] * 2, 1, 0, 30, table=table, tree=tree)
+    assert len(table) == 3
+    assert table.get(game.state_hash) is tree.action_node.parent
+
+
+def test_transposition_table_moves_root_to_depth_zero():
+    game = CountingGame()
+    agents = [Agent()] * 2
+    table = TranspositionTable(100, REPLACE_DEEPEST)
+    game.make_action(mcts_get_best_action(game, agents, 1, 0, 30, table=table))
+    # The next search's root was stored one action below the last root
+    root = table.get(game.state_hash)
+    assert table.depths[game.state_hash] == 1
+    tree = MCTSTree()
+    mcts_get_best_action(game, agents, 1, 0, 30, table=table, tree=tree)
+    assert tree.action_node.parent is root
+    assert table.depths[game.state_hash] == 0
+
+
+def select_uct_loop(n, w, parent_n, c):
+    """Select a child the way the object tree does, one child at a time."""
+    best, best_uct = None, -math.inf
+    for i in range(len(n)):
+        if n[i] == 0:
+            uct = math.inf
+        else:
+            uct = w[i] / n[i] + c * math.sqrt(math.log(parent_n) / n[i])
+        if uct > best_uct:
+            best, best_uct = i, uct
+    return best
+
+
+def test_select_uct_matches_loop():
+    rng = random.Random(0)
+    for _ in range(500):
+        size = rng.randint(1, 8)
+        n = np.array([rng.choice([0, 1, 2, 5, 20]) for _ in range(size)])
+        w = np.array([rng.uniform(0, 1) * k for k in n])
+        parent_n = int(n.sum()) + 1
+        c = rng.choice([0, 0.5, 1.4])
+        assert select_uct(n, w, parent_n, c) == select_uct_loop(n, w, parent_n, c)
+
+
+def test_select_uct_picks_first_unvisited_child():
+    n = np.array([3, 0, 2, 0])
+    w = np.array([3.0, 0.0, 2.0, 0.0])
+    assert select_uct(n, w, 5, 1) == select_uct_loop(n, w, 5, 1) == 1
+
+
+def test_select_uct_breaks_ties_by_order():
+    n = np.array([2, 4, 2, 4])
+    w = np.array([1.0, 3.0, 1.0, 3.0])
+    assert select_uct(n, w, 12, 0) == select_uct_loop(n, w, 12, 0) == 1
+    n = np.array([3, 3, 3])
+    w = np.array([1.0, 2.0, 2.0])
+    assert select_uct(n, w, 9, 1) == select_uct_loop(n, w, 9, 1) == 1
+
+
+def test_batch_iteration_removes_virtual_loss():
+    game = CountingGame(actions=[(1,), (2,), (3,), (4,)])
+    sequential = get_array_tree(game)
+    agent = Agent(TotalModel())
+    for _ in range(4):
+        array_iteration(sequential, game, agent, 1, 0)
+    batched = get_array_tree(game)
+    agent = Agent(TotalModel(batched))
+    array_batch_iteration(batched, game, agent, 1, 0, 4, virtual_loss=3)
+    # The whole batch was evaluated at once, while each of the 4 paths had a virtual loss of 3 visits
+    assert agent.model.root_visits == [12]
+    # Each leaf is under a different unvisited child of the root either way, so the trees are the same once the
+    # virtual loss has been removed
+    assert len(batched) == len(sequential)
+    assert batched.state_sons == sequential.state_sons
+    assert (batched.N[: len(batched)] == sequential.N[: len(sequential)]).all()
+    assert np.allclose(batched.w[: len(batched)], sequential.w[: len(sequential)])
+    assert batched.N[batched.root] == 4
+    assert game.total == 0
+
+
+def test_chance_outcomes_are_stratified():
+    game = CountingGame(actions=[(0,)], outcomes=[(1, 0.25), (2, 0.75)])
+    tree = get_array_tree(game)
+    roll = tree.first_child[tree.root]
+    agent = Agent(TotalModel())
+    for i in range(1, 9):
+        array_iteration(tree, game, agent, 1, 0, chance_nodes=True)
+        # Each outcome is always less than one visit from its share of the visits
+        counts = tree.chance_counts[roll]
+        assert counts.sum() == i
+        assert (abs(counts - np.array([0.25, 0.75]) * i) < 1).all()
+    assert list(tree.chance_counts[roll]) == [2, 6]
+    sons = tree.chance_sons[roll]
+    assert [tree.N[sons[0]], tree.N[sons[1]]] == [2, 6]
+
+
+def test_chance_node_value_is_expectation_of_outcomes():
+    tree = ArrayTree(players_num=2)
+    tree.root = tree.add_state_node(-1, 0, [(0,)])
+    roll = tree.root + 1
+    low = tree.add_state_node(roll, 1, [(1,)], state_hash=1)
+    high = tree.add_state_node(roll, 1, [(1,)], state_hash=2)
+    tree.chance_sons[roll] = {0: low, 1: high}
+    # The low roll has been visited once, with all the reward going to the first player
+    tree.N[[tree.root, roll, low, low + 1]] = 1
+    tree.w[[tree.root, roll, low, low + 1]] = [1, 0]
+    array_back_propagation(tree, [tree.root, roll, high, high + 1], [1, 3], np.array([0.25, 0.75]))
+    assert list(tree.w[high]) == [0.25, 0.75]
+    # The outcomes are weighted by their probabilities rather than by how often they were visited, so the value is
+    # the roll's 2 visits times 0.25 * [1, 0] + 0.75 * [0.25, 0.75]
+    assert tree.N[roll] == 2
+    assert np.allclose(tree.w[roll], [0.875, 1.125])
+    # Without chance probabilities the rewards are just added up
+    array_back_propagation(tree, [tree.root, roll, high, high + 1], [1, 3])
+    assert np.allclose(tree.w[roll], [1.125, 1.875])
+
+
+@pytest.mark.parametrize("iterations", [1, 2, 5, 10, 17, 30])
+def test_progressive_widening_limits_children(iterations):
+    widening = (1, 0.5)
+    game = CountingGame(actions=[(1,), (2,), (3,), (4,), (5,)])
+    agents = [Agent(TotalModel())] * 2
+    # The search's last iteration starts from a root visited iterations - 1 times
+    expected = min(5, max(1, math.ceil((iterations - 1) ** 0.5)))
+    tree = ArrayTree(2)
+    mcts_get_best_action(game, agents, 1, 0, iterations, tree=tree, widening=widening)
+    children = tree.get_children(tree.root)
+    # The children are ordered by the prior, best first, and only the first k have been visited
+    assert [tree.get_action(i) for i in children] == [(5,), (4,), (3,), (2,), (1,)]
+    assert [tree.N[i] > 0 for i in children] == [i < expected for i in range(5)]
+    object_tree = MCTSTree()
+    mcts_get_best_action(game, agents, 1, 0, iterations, tree=object_tree, widening=widening)
+    root = object_tree.action_node.parent
+    assert list(root.sons) == [(5,), (4,), (3,), (2,), (1,)]
+    assert [son.N > 0 for son in root.sons.values()] == [i < expected for i in range(5)]